@@ -3,12 +3,12 @@ Script to add test data to the PG Management System
 Run this to populate the database with sample data for testing
 """
 
-from simple_database import SimplePGDatabase
+from simple_database import get_database
 from datetime import date, timedelta
 
 def add_test_data():
     """Add comprehensive test data to database"""
-    db = SimplePGDatabase()
+    db = get_database()
     
     print("🚀 Adding test data to database...")
     print("-" * 50)
@@ -24,8 +24,7 @@ def add_test_data():
         ("106", "Non-AC", 5, 4500),
     ]
     
-    for room_number, room_type, sharing, rent in rooms_data:
-        success, message = db.add_room(room_number, room_type, sharing, rent)
+    for success, message in db.add_rooms(rooms_data):
         if success:
             print(f"  ✅ {message}")
         else:
@@ -66,8 +65,7 @@ def add_test_data():
         (8, 4, 2),  # Sanjay -> Room 104, Bed 2
     ]
     
-    for renter_id, room_id, bed_number in bed_allocations:
-        success, message = db.allocate_bed(renter_id, room_id, bed_number)
+    for success, message in db.allocate_beds(bed_allocations):
         if success:
             print(f"  ✅ {message}")
         else:
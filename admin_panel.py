@@ -1,19 +1,32 @@
 import streamlit as st
 import pandas as pd
+import tempfile
+import time
 from datetime import datetime, date
-from simple_database import SimplePGDatabase
+from simple_database import EXPORTS, get_database
+from bed_assignment import plan_assignments, commit_plan
+from room_import import import_rooms
+from data_export import EXPORT_FORMATS, export_to_buffer, parquet_available
+from payment_import import ingest_statement
+from report_jobs import get_report_jobs
 import plotly.express as px
 import plotly.graph_objects as go
 
+PAYMENTS_PAGE_SIZE = 50
+COMPLAINTS_PAGE_SIZE = 20
+COMPLAINTS_SEARCH_RESULTS = 50
+ARREARS_SHOWN = 10
+REPORT_POLL_SECONDS = 0.5
+
 def admin_dashboard():
     """Simple admin dashboard"""
     st.title("📊 Admin Dashboard")
     
-    db = SimplePGDatabase()
-    stats = db.get_dashboard_stats()
+    db = get_database()
+    stats = db.get_dashboard_snapshot(5)
     
     # Check for unread notifications
-    unread_count = db.get_unread_notification_count()
+    unread_count = stats['unread_notifications']
     if unread_count > 0:
         st.warning(f"🔔 You have {unread_count} unread notification{'s' if unread_count > 1 else ''}")
     
@@ -34,9 +47,33 @@ def admin_dashboard():
     
     st.markdown("---")
     
+    # Rent arrears
+    st.subheader("💸 Rent Arrears")
+    arrears = db.get_arrears()
+    
+    if arrears:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Total Outstanding", f"₹{sum(row[10] for row in arrears):,.0f}")
+        with col2:
+            st.metric("Renters Behind", len(arrears))
+        
+        df = pd.DataFrame(
+            [(row[1], row[2], row[3], row[6] - row[7], row[10], row[11] or "Never") for row in arrears[:ARREARS_SHOWN]],
+            columns=['Renter', 'Phone', 'Room', 'Unpaid Months', 'Outstanding', 'Last Paid']
+        )
+        df['Outstanding'] = df['Outstanding'].apply(lambda x: f'₹{x:,.0f}')
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        if len(arrears) > ARREARS_SHOWN:
+            st.caption(f"Showing the {ARREARS_SHOWN} largest of {len(arrears)}")
+    else:
+        st.success("✅ Every renter is paid up")
+    
+    st.markdown("---")
+    
     # Recent Notifications Section
     st.subheader("🔔 Recent Notifications")
-    notifications = db.get_admin_notifications(limit=5)
+    notifications = stats['recent_notifications']
     
     if notifications:
         for notif in notifications:
@@ -82,9 +119,9 @@ def room_management():
     """Simple room management"""
     st.title("🏠 Room Management")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
-    tab1, tab2 = st.tabs(["Add Room", "View Rooms"])
+    tab1, tab2, tab3 = st.tabs(["Add Room", "View Rooms", "Import Rooms"])
     
     with tab1:
         st.subheader("Add New Room")
@@ -124,12 +161,30 @@ def room_management():
             st.dataframe(df, use_container_width=True)
         else:
             st.info("No rooms added yet")
+    
+    with tab3:
+        st.subheader("Import Rooms")
+        st.write("Upload a CSV with columns `room_number, room_type, sharing_type, monthly_rent` "
+                 "or a JSON list of objects with the same keys. Beds are created automatically.")
+        
+        uploaded = st.file_uploader("Rooms file", type=["csv", "json"])
+        if uploaded and st.button("📥 Import Rooms", type="primary", use_container_width=True):
+            file_format = "json" if uploaded.name.lower().endswith(".json") else "csv"
+            summary = import_rooms(db, uploaded.getvalue(), file_format)
+            
+            if summary['added']:
+                st.success(f"✅ Added {summary['added']} rooms with {summary['beds']} beds "
+                           f"in {summary['seconds']:.2f}s")
+            for message in summary['skipped']:
+                st.warning(f"⚠️ {message}")
+            for line, message in summary['errors']:
+                st.error(f"❌ Line {line}: {message}")
 
 def renter_management():
     """Simple renter management"""
     st.title("👥 Renter Management")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
     tab1, tab2 = st.tabs(["Add Renter", "View Renters"])
     
@@ -171,72 +226,158 @@ def registration_management():
     """Bed allocation"""
     st.title("🛏️ Bed Allocation")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
-    renters = db.get_all_renters()
-    rooms = db.get_all_rooms()
+    tab1, tab2 = st.tabs(["Manual Allocation", "Auto Assign"])
     
-    if renters and rooms:
-        col1, col2 = st.columns(2)
+    with tab1:
+        renters = db.get_all_renters()
+        rooms = db.get_all_rooms()
+    
+        if renters and rooms:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            renter_options = {f"{r[1]} ({r[2]})": r[0] for r in renters if r[5]}
-            selected_renter = st.selectbox("Select Renter", list(renter_options.keys()))
+            with col1:
+                renter_options = {f"{r[1]} ({r[2]})": r[0] for r in renters if r[5]}
+                selected_renter = st.selectbox("Select Renter", list(renter_options.keys()))
         
-        with col2:
-            room_options = {f"Room {r[1]} ({r[2]}, {r[3]}-sharing)": r[0] for r in rooms}
-            selected_room = st.selectbox("Select Room", list(room_options.keys()))
+            with col2:
+                room_options = {f"Room {r[1]} ({r[2]}, {r[3]}-sharing)": r[0] for r in rooms}
+                selected_room = st.selectbox("Select Room", list(room_options.keys()))
         
-        if selected_renter and selected_room:
-            renter_id = renter_options[selected_renter]
-            room_id = room_options[selected_room]
+            if selected_renter and selected_room:
+                renter_id = renter_options[selected_renter]
+                room_id = room_options[selected_room]
             
-            beds = db.get_room_beds(room_id)
-            empty_beds = [bed for bed in beds if not bed[2]]
+                beds = db.get_room_beds(room_id)
+                empty_beds = [bed for bed in beds if not bed[2]]
             
-            if empty_beds:
-                bed_options = {f"Bed {bed[1]}": bed[1] for bed in empty_beds}
-                selected_bed = st.selectbox("Select Bed", list(bed_options.keys()))
+                if empty_beds:
+                    bed_options = {f"Bed {bed[1]}": bed[1] for bed in empty_beds}
+                    selected_bed = st.selectbox("Select Bed", list(bed_options.keys()))
                 
-                if st.button("🛏️ Allocate Bed", type="primary", use_container_width=True):
-                    bed_number = bed_options[selected_bed]
-                    success, message = db.allocate_bed(renter_id, room_id, bed_number)
-                    if success:
-                        st.success(f"✅ {message}")
-                        st.balloons()
-                        st.rerun()
-                    else:
-                        st.error(f"❌ {message}")
-            else:
-                st.warning("⚠️ No empty beds available in this room")
-    else:
-        if not renters:
-            st.info("Add renters first")
-        if not rooms:
-            st.info("Add rooms first")
+                    if st.button("🛏️ Allocate Bed", type="primary", use_container_width=True):
+                        bed_number = bed_options[selected_bed]
+                        success, message = db.allocate_bed(renter_id, room_id, bed_number)
+                        if success:
+                            st.success(f"✅ {message}")
+                            st.balloons()
+                            st.rerun()
+                        else:
+                            st.error(f"❌ {message}")
+                else:
+                    st.warning("⚠️ No empty beds available in this room")
+        else:
+            if not renters:
+                st.info("Add renters first")
+            if not rooms:
+                st.info("Add rooms first")
+    
+    with tab2:
+        auto_assignment(db)
+
+def auto_assignment(db):
+    """Plan best-fit beds for every renter without one, then allocate them together"""
+    st.subheader("Auto Assign Pending Renters")
+    
+    pending = db.get_unallocated_renters()
+    free_beds = db.get_free_beds()
+    
+    if not pending:
+        st.info("Every active renter has a bed")
+        return
+    if not free_beds:
+        st.warning("⚠️ No empty beds available")
+        return
+    
+    st.write(f"{len(pending)} renters waiting, {len(free_beds)} free beds. "
+             "Set preferences per renter; Max Rent 0 means no limit.")
+    
+    room_types = sorted({bed[2] for bed in free_beds})
+    sharing_types = sorted({bed[3] for bed in free_beds})
+    queue = pd.DataFrame([
+        {'Renter ID': r[0], 'Name': r[1], 'Phone': r[2],
+         'Room Type': 'Any', 'Sharing': 'Any', 'Max Rent': 0.0}
+        for r in pending
+    ])
+    edited = st.data_editor(
+        queue,
+        column_config={
+            'Room Type': st.column_config.SelectboxColumn(options=['Any'] + room_types, required=True),
+            'Sharing': st.column_config.SelectboxColumn(
+                options=['Any'] + [str(s) for s in sharing_types], required=True
+            ),
+            'Max Rent': st.column_config.NumberColumn(min_value=0.0, step=500.0, format="₹%.0f")
+        },
+        disabled=['Renter ID', 'Name', 'Phone'],
+        hide_index=True,
+        use_container_width=True,
+        key="assignment_queue"
+    )
+    
+    if st.button("🧮 Compute Plan", use_container_width=True):
+        requests = [
+            (int(row['Renter ID']), row['Name'],
+             None if row['Room Type'] == 'Any' else row['Room Type'],
+             None if row['Sharing'] == 'Any' else int(row['Sharing']),
+             float(row['Max Rent']) if pd.notna(row['Max Rent']) and row['Max Rent'] > 0 else None)
+            for row in edited.to_dict('records')
+        ]
+        st.session_state.assignment_plan = plan_assignments(db, requests)
+    
+    plan = st.session_state.get('assignment_plan')
+    if not plan:
+        return
+    
+    if plan['assignments']:
+        st.write(f"**Plan: {len(plan['assignments'])} beds**")
+        df = pd.DataFrame(
+            [(a[1], a[3], a[4], a[5]) for a in plan['assignments']],
+            columns=['Renter', 'Room', 'Bed', 'Rent']
+        )
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    if plan['unassigned']:
+        st.write(f"**Not placed: {len(plan['unassigned'])}**")
+        df = pd.DataFrame([(u[1], u[2]) for u in plan['unassigned']], columns=['Renter', 'Reason'])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    if plan['assignments'] and st.button("🛏️ Allocate Planned Beds", type="primary", use_container_width=True):
+        results = commit_plan(db, plan)
+        del st.session_state.assignment_plan
+        failed = [
+            (assignment[1], message)
+            for assignment, (success, message) in zip(plan['assignments'], results)
+            if not success
+        ]
+        if not failed:
+            st.success(f"✅ Allocated {len(results)} beds")
+            st.balloons()
+            st.rerun()
+        else:
+            # The plan is applied all or nothing, so nothing was allocated
+            st.warning("⚠️ No beds were allocated: the free beds changed since the plan was made. "
+                       "Compute a new plan and allocate again.")
+            for name, message in failed:
+                st.error(f"❌ {name}: {message}")
 
 def payment_management():
     """Simple payment management"""
     st.title("💰 Payment Management")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
-    tab1, tab2 = st.tabs(["Record Payment", "Payment History"])
+    tab1, tab2, tab3 = st.tabs(["Record Payment", "Payment History", "Import Statement"])
     
     with tab1:
         st.subheader("Record New Payment")
         
-        renters = db.get_all_renters()
         renter_options = {}
         
-        for renter in renters:
-            if renter[5]:  # Active
-                details = db.get_renter_details(renter[0])
-                if details and details[6]:  # Has room
-                    renter_options[f"{details[1]} - Room {details[6]}"] = {
-                        'id': renter[0],
-                        'rent': details[8] or 0
-                    }
+        for renter_id, name, phone, room_number, room_type, rent, bed_number in db.get_active_renters_with_rooms():
+            renter_options[f"{name} - Room {room_number}"] = {
+                'id': renter_id,
+                'rent': rent or 0
+            }
         
         if renter_options:
             with st.form("payment_form"):
@@ -277,24 +418,103 @@ def payment_management():
     with tab2:
         st.subheader("Payment History")
         
-        payments = db.get_all_payments()
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            month_from = st.text_input("From Month (YYYY-MM)", key="payments_month_from")
+        
+        with col2:
+            month_to = st.text_input("To Month (YYYY-MM)", key="payments_month_to")
+        
+        with col3:
+            method = st.selectbox("Payment Method", ["All", "Cash", "UPI", "Bank Transfer", "Card"],
+                                  key="payments_method")
+        
+        with col4:
+            renter_filter = {"All": None}
+            renter_filter.update({f"{r[1]} ({r[2]})": r[0] for r in db.get_all_renters()})
+            selected_renter = st.selectbox("Renter", list(renter_filter.keys()), key="payments_renter")
+        
+        filters = {
+            'month_from': month_from or None,
+            'month_to': month_to or None,
+            'payment_method': None if method == "All" else method,
+            'renter_id': renter_filter[selected_renter]
+        }
+        
+        # Start again from the first page whenever the filters change
+        if st.session_state.get('payments_filters') != filters:
+            st.session_state.payments_filters = filters
+            st.session_state.payments_cursors = [None]
+        
+        cursors = st.session_state.payments_cursors
+        payments, next_cursor = db.get_payments_page(PAYMENTS_PAGE_SIZE, cursors[-1], **filters)
         
         if payments:
+            summary = db.get_payments_summary(**filters)
+            
             df = pd.DataFrame(payments, columns=['ID', 'Renter', 'Month', 'Amount', 'Date', 'Method'])
             df['Amount'] = df['Amount'].apply(lambda x: f'₹{x:,.2f}')
             st.dataframe(df, use_container_width=True)
             
-            # Simple chart
-            total = sum([p[3] for p in payments])
-            st.metric("Total Revenue", f"₹{total:,.2f}")
+            total_pages = max(1, -(-summary['count'] // PAYMENTS_PAGE_SIZE))
+            col1, col2, col3 = st.columns([1, 2, 1])
+            
+            with col1:
+                if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            
+            with col2:
+                st.caption(f"Page {len(cursors)} of {total_pages} · {summary['count']} payments")
+            
+            with col3:
+                if st.button("Next ➡️", disabled=next_cursor is None, use_container_width=True):
+                    cursors.append(next_cursor)
+                    st.rerun()
+            
+            st.metric("Total Revenue", f"₹{summary['total']:,.2f}")
+        elif any(filters.values()):
+            st.info("No payments match the selected filters")
         else:
             st.info("No payments recorded yet")
+    
+    with tab3:
+        st.subheader("Import Bank / UPI Statement")
+        st.write("Upload the statement CSV. Credits are matched to renters by phone number "
+                 "or renter ID (RN...) in the narration; the month comes from the transaction date.")
+        
+        uploaded = st.file_uploader("Statement file", type=["csv"])
+        overwrite = st.checkbox("Replace recorded payments whose amount differs from the statement")
+        
+        if uploaded and st.button("📥 Import Payments", type="primary", use_container_width=True):
+            summary = ingest_statement(db, uploaded.getvalue(), overwrite)
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Matched", f"{summary['matched']:,} / {summary['rows']:,}")
+            col2.metric("Added", f"{summary['added']:,}")
+            col3.metric("Already Recorded", f"{summary['duplicates']:,}")
+            col4.metric("Updated", f"{summary['updated']:,}")
+            st.caption(f"Processed in {summary['seconds']:.2f}s ({summary['rows_per_second']:,.0f} rows/s)")
+            
+            if summary['conflicts']:
+                st.warning(f"⚠️ {len(summary['conflicts'])} conflicts")
+                df = pd.DataFrame(summary['conflicts'], columns=['Line', 'Renter', 'Problem'])
+                st.dataframe(df, use_container_width=True, hide_index=True)
+            if summary['unmatched']:
+                st.warning(f"❓ {len(summary['unmatched'])} rows did not match a renter")
+                df = pd.DataFrame(summary['unmatched'], columns=['Line', 'Reason'])
+                st.dataframe(df, use_container_width=True, hide_index=True)
+            if summary['skipped']:
+                st.info(f"⏭️ {len(summary['skipped'])} rows skipped (debits and unreadable rows)")
+                df = pd.DataFrame(summary['skipped'], columns=['Line', 'Reason'])
+                st.dataframe(df, use_container_width=True, hide_index=True)
 
 def complaint_management():
     """Admin complaint management"""
     st.title("📝 Complaint Management")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
     # Get complaint statistics
     stats = db.get_complaint_stats()
@@ -331,161 +551,212 @@ def complaint_management():
             "Water Supply", "Security", "Noise", "Room Issues", "Other"
         ])
     
+    search = st.text_input("🔍 Search complaints", placeholder="e.g. water leak, fan not working").strip()
+    
     st.markdown("---")
     
-    # Get all complaints
-    complaints = db.get_all_complaints()
+    if stats['total'] == 0:
+        st.info("📭 No complaints submitted yet")
+        st.markdown("""
+        <div style="text-align: center; padding: 2rem;">
+            <p>When renters submit complaints, they will appear here for review and action.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+    
+    filters = {
+        'status': None if filter_status == "All" else filter_status,
+        'priority': None if filter_priority == "All" else filter_priority,
+        'category': None if filter_category == "All" else filter_category
+    }
+    
+    # Start again from the first page whenever the filters change
+    if st.session_state.get('complaint_filters') != filters:
+        st.session_state.complaint_filters = filters
+        st.session_state.complaint_cursors = [None]
+    
+    cursors = st.session_state.complaint_cursors
+    if search:
+        # Best matches first, no paging
+        complaints = db.search_complaints(search, COMPLAINTS_SEARCH_RESULTS, **filters)
+        next_cursor = None
+    else:
+        complaints, next_cursor = db.get_complaints_page(COMPLAINTS_PAGE_SIZE, cursors[-1], **filters)
     
-    if complaints:
-        # Apply filters
-        filtered_complaints = complaints
-        
-        if filter_status != "All":
-            filtered_complaints = [c for c in filtered_complaints if c[5] == filter_status]
+    if not complaints:
+        st.info(f"No complaints found matching the selected filters")
+        return
+    
+    if search:
+        st.subheader(f"Top {len(complaints)} matches for \"{search}\"")
+    else:
+        st.subheader(f"Complaints ({db.get_complaints_count(**filters)})")
+    
+    # Description and response are loaded for every complaint that still needs
+    # action, so its form is always shown; resolved ones once "Show details" is ticked
+    loaded_ids = [
+        c[0] for c in complaints
+        if c[5] != 'Resolved' or st.session_state.get(f"details_{c[0]}")
+    ]
+    texts = db.get_complaint_texts(loaded_ids)
+    
+    # Display complaints
+    for complaint in complaints:
+        complaint_id, renter_name, title, category, priority, status, created_date, resolved_date, phone = complaint
         
-        if filter_priority != "All":
-            filtered_complaints = [c for c in filtered_complaints if c[4] == filter_priority]
+        # Status color coding
+        if status == 'Open':
+            status_color = "#ffc107"
+            status_icon = "🟡"
+        elif status == 'In Progress':
+            status_color = "#17a2b8"
+            status_icon = "🔵"
+        else:
+            status_color = "#28a745"
+            status_icon = "🟢"
         
-        if filter_category != "All":
-            filtered_complaints = [c for c in filtered_complaints if c[3] == filter_category]
+        # Priority color coding
+        if priority == 'High':
+            priority_color = "#dc3545"
+            priority_icon = "🔴"
+        elif priority == 'Medium':
+            priority_color = "#ffc107"
+            priority_icon = "🟡"
+        else:
+            priority_color = "#28a745"
+            priority_icon = "🟢"
         
-        if filtered_complaints:
-            st.subheader(f"Complaints ({len(filtered_complaints)})")
+        with st.expander(f"{status_icon} {priority_icon} [{category}] {title} - {renter_name}", expanded=(status == 'Open')):
+            # Complaint details
+            col1, col2, col3, col4 = st.columns(4)
             
-            # Display complaints
-            for complaint in filtered_complaints:
-                complaint_id, renter_name, title, category, priority, status, created_date, description, admin_response, resolved_date, phone = complaint
-                
-                # Status color coding
-                if status == 'Open':
-                    status_color = "#ffc107"
-                    status_icon = "🟡"
-                elif status == 'In Progress':
-                    status_color = "#17a2b8"
-                    status_icon = "🔵"
-                else:
-                    status_color = "#28a745"
-                    status_icon = "🟢"
-                
-                # Priority color coding
-                if priority == 'High':
-                    priority_color = "#dc3545"
-                    priority_icon = "🔴"
-                elif priority == 'Medium':
-                    priority_color = "#ffc107"
-                    priority_icon = "🟡"
-                else:
-                    priority_color = "#28a745"
-                    priority_icon = "🟢"
+            with col1:
+                st.markdown(f"**Status:** <span style='color: {status_color};'>{status}</span>", unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"**Priority:** <span style='color: {priority_color};'>{priority}</span>", unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"**Category:** {category}")
+            with col4:
+                st.markdown(f"**Submitted:** {created_date}")
+            
+            st.markdown("---")
+            
+            col1, col2 = st.columns([2, 1])
+            
+            with col1:
+                st.markdown("**Renter Details:**")
+                st.write(f"👤 {renter_name}")
+                st.write(f"📱 {phone}")
+            
+            with col2:
+                if resolved_date:
+                    st.markdown(f"**Resolved on:** {resolved_date}")
+            
+            if status == 'Resolved':
+                st.checkbox("📄 Show details", key=f"details_{complaint_id}")
+            
+            if complaint_id not in texts:
+                continue
+            
+            description, admin_response = texts[complaint_id]
+            
+            st.markdown("---")
+            st.markdown("**Description:**")
+            st.write(description)
+            
+            if admin_response:
+                st.markdown("---")
+                st.markdown("**Previous Admin Response:**")
+                st.info(admin_response)
+            
+            # Admin action form
+            if status != 'Resolved':
+                st.markdown("---")
+                st.markdown("**Admin Action:**")
                 
-                with st.expander(f"{status_icon} {priority_icon} [{category}] {title} - {renter_name}", expanded=(status == 'Open')):
-                    # Complaint details
-                    col1, col2, col3, col4 = st.columns(4)
+                with st.form(f"admin_action_{complaint_id}"):
+                    new_status = st.selectbox(
+                        "Update Status",
+                        ["Open", "In Progress", "Resolved"],
+                        index=["Open", "In Progress", "Resolved"].index(status) if status in ("Open", "In Progress", "Resolved") else 0,
+                        key=f"status_{complaint_id}"
+                    )
                     
-                    with col1:
-                        st.markdown(f"**Status:** <span style='color: {status_color};'>{status}</span>", unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(f"**Priority:** <span style='color: {priority_color};'>{priority}</span>", unsafe_allow_html=True)
-                    with col3:
-                        st.markdown(f"**Category:** {category}")
-                    with col4:
-                        st.markdown(f"**Submitted:** {created_date}")
+                    response = st.text_area(
+                        "Admin Response",
+                        value=admin_response or "",
+                        placeholder="Enter your response to the renter...",
+                        key=f"response_{complaint_id}"
+                    )
                     
-                    st.markdown("---")
-                    
-                    col1, col2 = st.columns([2, 1])
+                    col1, col2 = st.columns([1, 4])
                     
                     with col1:
-                        st.markdown("**Renter Details:**")
-                        st.write(f"👤 {renter_name}")
-                        st.write(f"📱 {phone}")
-                    
-                    with col2:
-                        if resolved_date:
-                            st.markdown(f"**Resolved on:** {resolved_date}")
+                        submit = st.form_submit_button("Update", use_container_width=True)
                     
-                    st.markdown("---")
-                    st.markdown("**Description:**")
-                    st.write(description)
-                    
-                    if admin_response:
-                        st.markdown("---")
-                        st.markdown("**Previous Admin Response:**")
-                        st.info(admin_response)
-                    
-                    # Admin action form
-                    if status != 'Resolved':
-                        st.markdown("---")
-                        st.markdown("**Admin Action:**")
-                        
-                        with st.form(f"admin_action_{complaint_id}"):
-                            new_status = st.selectbox(
-                                "Update Status",
-                                ["Open", "In Progress", "Resolved"],
-                                index=["Open", "In Progress", "Resolved"].index(status),
-                                key=f"status_{complaint_id}"
+                    if submit:
+                        if response:
+                            success, message = db.update_complaint_status(
+                                complaint_id,
+                                new_status,
+                                response
                             )
-                            
-                            response = st.text_area(
-                                "Admin Response",
-                                value=admin_response or "",
-                                placeholder="Enter your response to the renter...",
-                                key=f"response_{complaint_id}"
-                            )
-                            
-                            col1, col2 = st.columns([1, 4])
-                            
-                            with col1:
-                                submit = st.form_submit_button("Update", use_container_width=True)
-                            
-                            if submit:
-                                if response:
-                                    success, message = db.update_complaint_status(
-                                        complaint_id,
-                                        new_status,
-                                        response
-                                    )
-                                    if success:
-                                        st.success("✅ " + message)
-                                        st.rerun()
-                                    else:
-                                        st.error("❌ " + message)
-                                else:
-                                    st.warning("⚠️ Please provide a response")
-        else:
-            st.info(f"No complaints found matching the selected filters")
-    else:
-        st.info("📭 No complaints submitted yet")
-        st.markdown("""
-        <div style="text-align: center; padding: 2rem;">
-            <p>When renters submit complaints, they will appear here for review and action.</p>
-        </div>
-        """, unsafe_allow_html=True)
+                            if success:
+                                st.success("✅ " + message)
+                                st.rerun()
+                            else:
+                                st.error("❌ " + message)
+                        else:
+                            st.warning("⚠️ Please provide a response")
+    
+    if search:
+        return
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True,
+                     key="complaints_prev"):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    
+    with col3:
+        if st.button("Next ➡️", disabled=next_cursor is None, use_container_width=True,
+                     key="complaints_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+def report_result(db, report, *args):
+    """Build a report on the report job pool, polling until it is ready; None if the build failed"""
+    jobs = get_report_jobs(db)
+    key = jobs.submit(report, *args)
+    state, value = jobs.status(key)
+    if state == 'done':
+        return value
+    if state == 'failed':
+        st.error(f"❌ Report failed: {value}")
+        return None
+    
+    # Still building in a worker process; check again shortly
+    with st.spinner("⏳ Building report..."):
+        time.sleep(REPORT_POLL_SECONDS)
+    st.rerun()
 
 def reports():
     """Simple reports"""
     st.title("📊 Reports")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
-    report_type = st.selectbox("Select Report", ["Occupancy", "Revenue", "Renters"])
+    report_type = st.selectbox("Select Report", ["Occupancy", "Revenue", "Forecast", "Renters", "Export"])
     
     if report_type == "Occupancy":
-        rooms = db.get_all_rooms()
-        if rooms:
-            data = []
-            for room in rooms:
-                beds = db.get_room_beds(room[0])
-                occupied = sum(1 for bed in beds if bed[2])
-                data.append({
-                    'Room': room[1],
-                    'Type': room[2],
-                    'Total Beds': room[3],
-                    'Occupied': occupied,
-                    'Empty': room[3] - occupied
-                })
-            
-            df = pd.DataFrame(data)
+        occupancy = report_result(db, 'occupancy')
+        if occupancy:
+            df = pd.DataFrame(occupancy, columns=['Room', 'Type', 'Total Beds', 'Occupied', 'Empty'])
             st.dataframe(df, use_container_width=True)
             
             fig = px.bar(df, x='Room', y=['Occupied', 'Empty'], 
@@ -493,9 +764,10 @@ def reports():
             st.plotly_chart(fig, use_container_width=True)
     
     elif report_type == "Revenue":
-        payments = db.get_all_payments()
-        if payments:
-            df = pd.DataFrame(payments, columns=['ID', 'Renter', 'Month', 'Amount', 'Date', 'Method'])
+        # A few rows per month from the trigger-maintained rollup, however many payments exist
+        rollup = report_result(db, 'revenue')
+        if rollup:
+            df = pd.DataFrame(rollup, columns=['Month', 'Method', 'Room Type', 'Payments', 'Amount'])
             
             monthly = df.groupby('Month')['Amount'].sum().reset_index()
             
@@ -503,11 +775,83 @@ def reports():
                          title='Monthly Revenue Trend')
             st.plotly_chart(fig, use_container_width=True)
             
-            st.dataframe(df, use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = px.bar(df, x='Month', y='Amount', color='Method', title='Revenue by Payment Method')
+                st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                fig = px.bar(df, x='Month', y='Amount', color='Room Type', title='Revenue by Room Type')
+                st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    elif report_type == "Forecast":
+        col1, col2 = st.columns(2)
+        with col1:
+            months = st.slider("Months to forecast", 3, 12, 6)
+        with col2:
+            lookback = st.slider("Months of history", 6, 24, 12)
+        
+        projection = report_result(db, 'forecast', months, lookback)
+        if projection is None:
+            return
+        
+        revenue = projection['revenue']
+        if not revenue.empty:
+            fig = px.line(revenue, x='Month', y='Amount', color='Room Type', line_dash='Kind',
+                          title='Revenue: Actual and Forecast')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            upcoming = revenue[revenue['Kind'] == 'Forecast'].groupby('Month')['Amount'].sum()
+            st.metric(f"Forecast Revenue, next {months} months", f"₹{upcoming.sum():,.0f}")
+        else:
+            st.info("No payment history to forecast from")
+        
+        occupancy = projection['occupancy']
+        if not occupancy.empty:
+            fig = px.line(occupancy, x='Month', y='Occupancy %', color='Room Type',
+                          title='Projected Occupancy', range_y=[0, 105])
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption("Projection adds the recent monthly move-in rate to today's occupied beds, "
+                       "assuming current renters stay.")
     
     elif report_type == "Renters":
-        renters = db.get_all_renters()
+        renters = report_result(db, 'renters')
         if renters:
             df = pd.DataFrame(renters, columns=['ID', 'Name', 'Phone', 'Email', 'Join Date', 'Active'])
             df['Active'] = df['Active'].map({1: 'Yes', 0: 'No'})
-            st.dataframe(df, use_container_width=True)
\ No newline at end of file
+            st.dataframe(df, use_container_width=True)
+    
+    elif report_type == "Export":
+        st.subheader("Export Data")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            export_name = st.selectbox("Data", sorted(EXPORTS), format_func=str.title)
+        with col2:
+            formats = [f for f in EXPORT_FORMATS if f != "parquet" or parquet_available()]
+            file_format = st.selectbox("Format", formats, format_func=str.upper)
+        if not parquet_available():
+            st.caption("Install pyarrow to export Parquet files")
+        
+        if st.button("📦 Prepare Export", use_container_width=True):
+            # Rows are streamed to a temporary file, never held in a DataFrame;
+            # download_button only takes bytes or a plain reader, so hand it the file's bytes
+            try:
+                with tempfile.TemporaryFile() as export_file:
+                    count = export_to_buffer(db, export_name, file_format, export_file)
+                    export_file.seek(0)
+                    export_data = export_file.read()
+            except Exception as e:
+                st.error(f"❌ Export failed: {e}")
+                return
+            
+            st.success(f"✅ {count:,} rows ready")
+            st.download_button(
+                "⬇️ Download",
+                data=export_data,
+                file_name=f"{export_name}_{date.today().isoformat()}.{file_format}",
+                mime="text/csv" if file_format == "csv" else "application/octet-stream",
+                type="primary",
+                use_container_width=True
+            )
\ No newline at end of file
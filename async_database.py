@@ -0,0 +1,75 @@
+"""
+asyncio facade over SimplePGDatabase
+
+Every method of the wrapped database is available as a coroutine that
+runs the synchronous call on a thread pool. Each thread checks out its
+own pooled connection, and SQLite releases the GIL while it works, so
+independent reads really do overlap under WAL. Writes still serialize on
+the SQLite write lock as before.
+
+Synchronous code uses fetch_concurrently to fan out a set of reads and
+wait for all of them. Only use it where benchmark_async.py shows a gain;
+cached reads just pay for the event loop and thread handoff:
+
+    data = fetch_concurrently(db, stats=('get_dashboard_snapshot', 5), arrears=('get_arrears',))
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_database import get_database
+
+
+class AsyncPGDatabase:
+    """Awaitable versions of every SimplePGDatabase method, run on a thread pool"""
+
+    def __init__(self, db=None, max_workers=None):
+        self.db = db or get_database()
+        # More threads than pooled connections would only wait on the pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.db.pool.max_size,
+            thread_name_prefix="pg-db"
+        )
+
+    def __getattr__(self, name):
+        attribute = getattr(self.db, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attribute, *args, **kwargs))
+
+        call.__name__ = name
+        return call
+
+    async def gather(self, **calls):
+        """Run named calls at once; each value is (method_name, *args). Returns {name: result}"""
+        names = list(calls)
+        results = await asyncio.gather(*(getattr(self, calls[name][0])(*calls[name][1:]) for name in names))
+        return dict(zip(names, results))
+
+    def close(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=True)
+
+
+_facades = {}
+_facades_lock = threading.Lock()
+
+
+def get_async_database(db=None):
+    """Shared AsyncPGDatabase for a database, so its thread pool is reused across reruns"""
+    db = db or get_database()
+    with _facades_lock:
+        facade = _facades.get(db.db_key)
+        if facade is None:
+            facade = _facades[db.db_key] = AsyncPGDatabase(db)
+        return facade
+
+
+def fetch_concurrently(db, **calls):
+    """Run independent reads of db concurrently from synchronous code; returns {name: result}"""
+    return asyncio.run(get_async_database(db).gather(**calls))
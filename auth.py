@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from simple_database import SimplePGDatabase
+from simple_database import get_database
 
 def init_session_state():
     """Initialize session state variables"""
@@ -31,7 +31,7 @@ def login_page():
             submit = st.form_submit_button("Login as Admin")
             
             if submit:
-                db = SimplePGDatabase()
+                db = get_database()
                 admin = db.authenticate_admin(username, password)
                 
                 if admin:
@@ -51,7 +51,7 @@ def login_page():
             submit = st.form_submit_button("Login as Renter")
             
             if submit:
-                db = SimplePGDatabase()
+                db = get_database()
                 renter = db.authenticate_renter(phone)
                 
                 if renter:
@@ -79,7 +79,7 @@ def login_page():
             
             if submit:
                 if name and phone:
-                    db = SimplePGDatabase()
+                    db = get_database()
                     success, message = db.add_renter(name, phone, email, join_date)
                     if success:
                         st.success(f"✅ {message}")
@@ -0,0 +1,105 @@
+"""
+Best-fit bed assignment for pending renters
+
+Loads every free bed once and keeps them in memory, grouped by room type
+and sharing type, with each group sorted by rent. Each renter in the
+queue gets the most expensive bed that fits their preferences and budget.
+That leaves the cheaper beds for renters with smaller budgets. A renter
+with no budget fits every bed, so they would get the priciest one ahead
+of budgeted renters queued after them; they are planned last, after
+every budgeted renter, and take the priciest beds still free.
+
+The result is a plan only; commit_plan writes it through allocate_beds
+in one transaction, all or nothing. If a planned bed was taken since the
+plan was made, no bed is allocated and the plan has to be recomputed.
+
+A request is (renter_id, name, room_type, sharing_type, max_rent). A
+preference of None means any.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+class FreeBedIndex:
+    """Free beds grouped by (room_type, sharing_type), cheapest first"""
+
+    def __init__(self, free_beds):
+        # (room_type, sharing_type) -> parallel lists of rents and beds
+        self._rents = {}
+        self._beds = {}
+        for bed in sorted(free_beds, key=lambda b: (b[4], b[1], b[5])):
+            room_id, room_number, room_type, sharing_type, monthly_rent, bed_number = bed
+            group = (room_type, sharing_type)
+            self._rents.setdefault(group, []).append(monthly_rent)
+            self._beds.setdefault(group, []).append(bed)
+
+    def __len__(self):
+        return sum(len(beds) for beds in self._beds.values())
+
+    def _best_in_group(self, group, max_rent):
+        """Position of the priciest bed at or under max_rent, or None"""
+        rents = self._rents[group]
+        end = len(rents) if max_rent is None else bisect_right(rents, max_rent)
+        if end == 0:
+            return None
+        # Lowest room and bed number among beds at that rent
+        return bisect_left(rents, rents[end - 1], 0, end)
+
+    def take(self, room_type=None, sharing_type=None, max_rent=None):
+        """Remove and return the best-fitting free bed, or None"""
+        best = None
+        for group in self._beds:
+            if room_type is not None and group[0] != room_type:
+                continue
+            if sharing_type is not None and group[1] != sharing_type:
+                continue
+            position = self._best_in_group(group, max_rent)
+            if position is None:
+                continue
+
+            bed = self._beds[group][position]
+            # Higher rent wins; on equal rent the lower room number wins
+            if best is None or bed[4] > best[2][4] or (bed[4] == best[2][4] and bed[1] < best[2][1]):
+                best = (group, position, bed)
+
+        if best is None:
+            return None
+        group, position, bed = best
+        del self._rents[group][position]
+        del self._beds[group][position]
+        return bed
+
+
+def plan_assignments(db, requests):
+    """Assign free beds to a queue of requests in order, renters without a budget last
+
+    Returns {'assignments': [(renter_id, name, room_id, room_number, bed_number, monthly_rent)],
+             'unassigned': [(renter_id, name, reason)]}
+    """
+    index = FreeBedIndex(db.get_free_beds())
+    assignments = []
+    unassigned = []
+
+    # Stable sort: queue order is kept within the budgeted and unbudgeted groups
+    for renter_id, name, room_type, sharing_type, max_rent in sorted(requests, key=lambda r: r[4] is None):
+        if not len(index):
+            unassigned.append((renter_id, name, "No free beds left"))
+            continue
+
+        bed = index.take(room_type, sharing_type, max_rent)
+        if bed is None:
+            unassigned.append((renter_id, name, "No free bed matches the preferences"))
+            continue
+
+        room_id, room_number, _, _, monthly_rent, bed_number = bed
+        assignments.append((renter_id, name, room_id, room_number, bed_number, monthly_rent))
+
+    return {'assignments': assignments, 'unassigned': unassigned}
+
+
+def commit_plan(db, plan):
+    """Allocate every planned bed or none; returns (success, message) per assignment"""
+    return db.allocate_beds([
+        (renter_id, room_id, bed_number)
+        for renter_id, _, room_id, _, bed_number, _ in plan['assignments']
+    ], atomic=True)
@@ -0,0 +1,96 @@
+"""
+Sequential vs concurrent page loads through the async facade
+
+Seeds a database the size of a large PG chain, then loads the reads
+behind the admin dashboard and the reports page in two ways: one after
+another, as a plain SimplePGDatabase page does, and all at once through
+async_database.fetch_concurrently. The query cache is off, so every
+call reaches SQLite. Reports the median wall-clock time of each.
+
+Run: python benchmark_async.py [--renters 20000] [--repeat 10]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from async_database import fetch_concurrently
+from query_cache import query_cache
+from simple_database import SimplePGDatabase
+
+PAGES = {
+    'Dashboard': {
+        'stats': ('get_dashboard_snapshot', 5),
+        'arrears': ('get_arrears',),
+        'complaints': ('get_complaint_stats',),
+    },
+    'Reports': {
+        'occupancy': ('get_occupancy_report',),
+        'revenue': ('get_revenue_rollup',),
+        'renters': ('get_all_renters',),
+        'move_ins': ('get_move_ins',),
+        'rooms': ('get_all_rooms',),
+    },
+}
+
+
+def seed(db, renters):
+    rooms = -(-renters // 4)
+    db.add_rooms([(f"{i:05d}", "AC" if i % 2 else "Non-AC", 4, 5000 + i % 5 * 500) for i in range(1, rooms + 1)])
+
+    rng = random.Random(7)
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO renters (name, phone, join_date) VALUES (?, ?, ?)",
+            [(f"Renter {i}", f"9{i:09d}", f"2025-{i % 12 + 1:02d}-10") for i in range(1, renters + 1)]
+        )
+    db.allocate_beds([(i, (i - 1) // 4 + 1, (i - 1) % 4 + 1) for i in range(1, renters + 1)])
+    db.add_payments([
+        (i, f"2025-{month:02d}", 5000, f"2025-{month:02d}-05", rng.choice(["UPI", "Cash"]))
+        for i in range(1, renters + 1)
+        for month in range(i % 12 + 1, 13)
+        if rng.random() < 0.9
+    ])
+    for i in range(1, renters // 10 + 1):
+        db.add_notification("Benchmark", f"Notification {i}", i)
+
+
+def time_page(db, calls, repeat):
+    sequential = []
+    concurrent = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for method, *args in calls.values():
+            getattr(db, method)(*args)
+        sequential.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        fetch_concurrently(db, **calls)
+        concurrent.append(time.perf_counter() - started)
+    return statistics.median(sequential), statistics.median(concurrent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renters", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    query_cache.enabled = False
+    db = SimplePGDatabase(os.path.join(tempfile.mkdtemp(), "bench_async.db"))
+    seed(db, args.renters)
+
+    print(f"⏱️  {args.renters:,} renters, median of {args.repeat} loads, query cache off")
+    print("-" * 60)
+    print(f"{'Page':<12}{'Sequential':>14}{'Concurrent':>14}{'Speedup':>12}")
+    for page, calls in PAGES.items():
+        sequential, concurrent = time_page(db, calls, args.repeat)
+        print(f"{page:<12}{sequential * 1000:>12.1f}ms{concurrent * 1000:>12.1f}ms"
+              f"{sequential / concurrent:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Mixed read/write throughput benchmark for the connection profiles
+
+Starts several worker processes, like several Streamlit workers sharing
+one database file. Each worker runs a few session threads that mostly
+read dashboard data and sometimes record a payment, complaint or
+notification. Every profile in CONNECTION_PROFILES runs against a fresh
+database, and the script reports operations per second and how many
+writes failed with "database is locked".
+
+Run: python benchmark_concurrency.py [--seconds 5] [--workers 4] [--threads 4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date
+
+from simple_database import CONNECTION_PROFILES, SimplePGDatabase
+from query_cache import query_cache
+
+WRITE_RATIO = 0.2
+
+
+def seed(db_name, profile, rooms=50, renters=200):
+    db = SimplePGDatabase(db_name, profile)
+    for i in range(1, rooms + 1):
+        db.add_room(f"{i:03d}", "AC", 4, 6000)
+    for i in range(1, renters + 1):
+        db.add_renter(f"Renter {i}", f"9{i:09d}", None, date(2025, 1, 1))
+        db.allocate_bed(i, (i - 1) // 4 + 1, (i - 1) % 4 + 1)
+
+
+def session(db, worker_id, thread_id, deadline, counts, lock):
+    rng = random.Random(worker_id * 1000 + thread_id)
+    local = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+    sequence = 0
+
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < WRITE_RATIO:
+                sequence += 1
+                renter_id = rng.randint(1, 200)
+                choice = rng.randint(0, 2)
+                if choice == 0:
+                    # Unique month per write so the UNIQUE constraint never fires
+                    month = f"w{worker_id}t{thread_id}-{sequence}"
+                    ok, message = db.add_payment(renter_id, month, 6000, date.today(), "UPI")
+                elif choice == 1:
+                    ok, message = db.add_complaint(renter_id, "Fan noise", "Fan is noisy", "Maintenance")
+                else:
+                    ok = db.add_notification("Benchmark", "Write", renter_id)
+                    message = "" if ok else "Error"
+
+                if ok:
+                    local['writes'] += 1
+                elif "locked" in message:
+                    local['locked'] += 1
+                else:
+                    local['errors'] += 1
+            else:
+                db.get_dashboard_stats()
+                db.get_admin_notifications(limit=5)
+                db.get_unread_notification_count()
+                local['reads'] += 1
+        except Exception as e:
+            if "locked" in str(e):
+                local['locked'] += 1
+            else:
+                local['errors'] += 1
+
+    with lock:
+        for key, value in local.items():
+            counts[key] += value
+
+
+def worker(db_name, profile, worker_id, threads, seconds, results):
+    # Measure the connection profile, not the query cache
+    query_cache.enabled = False
+    db = SimplePGDatabase(db_name, profile)
+    counts = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    pool = [
+        threading.Thread(target=session, args=(db, worker_id, t, deadline, counts, lock))
+        for t in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put(counts)
+
+
+def run_profile(profile, workers, threads, seconds):
+    workdir = tempfile.mkdtemp()
+    db_name = os.path.join(workdir, f"bench_{profile}.db")
+    seed(db_name, profile)
+
+    # spawn, not fork: a forked child would inherit the pool seed() opened
+    # and reuse its SQLite connection, which SQLite does not support
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(db_name, profile, w, threads, seconds, results))
+        for w in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    totals = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for p in processes:
+        p.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"⏱️  {args.workers} workers x {args.threads} sessions, {args.seconds:g}s per profile, "
+          f"{WRITE_RATIO:.0%} writes")
+    print("-" * 72)
+    print(f"{'Profile':<12}{'Reads/s':>12}{'Writes/s':>12}{'Locked':>10}{'Errors':>10}")
+
+    for profile in CONNECTION_PROFILES:
+        totals = run_profile(profile, args.workers, args.threads, args.seconds)
+        print(f"{profile:<12}{totals['reads'] / args.seconds:>12,.0f}"
+              f"{totals['writes'] / args.seconds:>12,.0f}"
+              f"{totals['locked']:>10}{totals['errors']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Round-trip check for the data exports
+
+Seeds a scratch database, writes every entry in EXPORTS in every format
+and reads each file back, comparing the header and row count with what
+was exported. Parquet is skipped, with a warning, when pyarrow is not
+installed. Exits with status 1 if any export fails or reads back wrong.
+
+Run: python check_exports.py
+"""
+
+import csv
+import os
+import sys
+import tempfile
+
+from check_query_plans import seed
+from data_export import EXPORT_FORMATS, export_columns, export_to_file, parquet_available
+from simple_database import EXPORTS, SimplePGDatabase
+
+
+def read_back(path, file_format):
+    """(columns, row count) of an exported file"""
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        return table.column_names, table.num_rows
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    return rows[0], len(rows) - 1
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    db = SimplePGDatabase(os.path.join(workdir, "export_check.db"))
+    seed(db)
+
+    problems = []
+    for name in sorted(EXPORTS):
+        for file_format in EXPORT_FORMATS:
+            if file_format == "parquet" and not parquet_available():
+                print(f"⚠️  {name}.parquet: skipped, pyarrow is not installed")
+                continue
+
+            path = os.path.join(workdir, f"{name}.{file_format}")
+            try:
+                count = export_to_file(db, name, file_format, path)
+                columns, rows = read_back(path, file_format)
+            except Exception as e:
+                problems.append(f"{name}.{file_format}: {type(e).__name__}: {e}")
+                continue
+
+            if columns != export_columns(name):
+                problems.append(f"{name}.{file_format}: columns {columns}")
+            elif rows != count:
+                problems.append(f"{name}.{file_format}: wrote {count} rows, read back {rows}")
+            else:
+                print(f"✅ {name}.{file_format}: {count:,} rows")
+
+    if problems:
+        print("\n❌ Export problems:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Query plan check for SimplePGDatabase
+
+Seeds a scratch database, calls every public read method while tracing
+the SQL it runs, and prints EXPLAIN QUERY PLAN for each statement.
+Exits with status 1 if any statement does a full table scan on one of the
+large tables, or if a public read method is missing from READ_CALLS.
+
+Run: python check_query_plans.py
+"""
+
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from simple_database import SimplePGDatabase
+from query_cache import query_cache
+
+# Tables that grow with the business; rooms and admins stay small
+LARGE_TABLES = {'renters', 'beds', 'payments', 'complaints', 'notifications'}
+
+# Sample arguments for every public read method
+READ_CALLS = {
+    'authenticate_admin': ('admin', 'admin123'),
+    'authenticate_renter': ('9000000001',),
+    'get_all_renters': (),
+    'get_renter_details': (1,),
+    'get_renters_by_contact': (['9000000001', '9000000002'], ['RN25010003']),
+    'get_active_renters_with_rooms': (),
+    'get_all_rooms': (),
+    'get_room_beds': (1,),
+    'get_occupancy_report': (),
+    'get_move_ins': ('2025-01',),
+    'get_free_beds': (),
+    'get_unallocated_renters': (),
+    'get_renter_payments': (1,),
+    'get_all_payments': (),
+    'get_payments_page': (50, ('2025-02-05', 300)),
+    'get_payments_summary': ('2025-01', '2025-02'),
+    'get_arrears': ('2025-06',),
+    'get_revenue_rollup': ('2025-01', '2025-03'),
+    'get_stats_counters': (),
+    'get_change_sequences': (),
+    'get_dashboard_stats': (),
+    'get_dashboard_snapshot': (5,),
+    'get_all_complaints': (),
+    'get_complaints_page': (20, (1, 1, '2025-06-01 00:00:00', 50), None, None, 'Maintenance'),
+    'get_complaints_count': (None, None, 'Maintenance'),
+    'search_complaints': ('water leak', 50, 'Open'),
+    'get_complaint_texts': ([1, 2, 3],),
+    'get_renter_complaints': (1,),
+    'get_complaint_stats': (),
+    'get_admin_notifications': (5,),
+    'get_unread_notification_count': (),
+}
+
+READ_PREFIXES = ('get_', 'authenticate_', 'search_')
+
+# Methods under a read prefix that do not query the tables
+NOT_QUERIES = {'get_connection'}
+
+
+def seed(db, rooms=20, renters=200):
+    """Fill the scratch database through the public write methods"""
+    for i in range(1, rooms + 1):
+        db.add_room(f"{i:03d}", "AC" if i % 2 else "Non-AC", 4, 5000 + i * 100)
+
+    start = date(2025, 1, 1)
+    for i in range(1, renters + 1):
+        db.add_renter(f"Renter {i}", f"9{i:09d}", None, start + timedelta(days=i % 90))
+
+    for i in range(1, min(renters, rooms * 4) + 1):
+        db.allocate_bed(i, (i - 1) // 4 + 1, (i - 1) % 4 + 1)
+
+    for i in range(1, renters + 1):
+        for month in range(1, 4):
+            db.add_payment(i, f"2025-{month:02d}", 5000, date(2025, month, 5), "UPI")
+        db.add_complaint(i, "Water leak", "Tap is leaking", "Maintenance", "High")
+        db.add_notification("Profile Update", f"Renter {i} updated their profile", i)
+
+
+def collect_statements(db):
+    """Call every public read method and return the SELECTs it ran"""
+    statements = []
+    conn = db.pool.acquire()
+    conn.set_trace_callback(statements.append)
+    db.pool.release(conn)
+
+    try:
+        for name, args in READ_CALLS.items():
+            start = len(statements)
+            getattr(db, name)(*args)
+            for sql in statements[start:]:
+                if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                    yield name, sql
+    finally:
+        conn.set_trace_callback(None)
+
+
+def find_full_scans(plan_rows, sql):
+    """Return plan lines that scan a large table without an index"""
+    # Map aliases back to table names: "FROM payments p", "JOIN beds b"
+    aliases = {}
+    for table, alias in re.findall(r'(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in ('ON', 'WHERE', 'JOIN', 'LEFT', 'ORDER', 'GROUP', 'LIMIT'):
+            aliases[alias] = table
+
+    scans = []
+    for row in plan_rows:
+        detail = row[3]
+        match = re.match(r'SCAN (\w+)', detail)
+        if match and 'INDEX' not in detail:
+            if aliases.get(match.group(1), match.group(1)) in LARGE_TABLES:
+                scans.append(detail)
+    return scans
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    # Every call must reach SQLite so its statements show up in the trace
+    query_cache.enabled = False
+    db = SimplePGDatabase(os.path.join(workdir, "plan_check.db"))
+    seed(db)
+
+    problems = []
+
+    public_reads = {
+        name for name in dir(db)
+        if name.startswith(READ_PREFIXES) and callable(getattr(db, name)) and name not in NOT_QUERIES
+    }
+    for name in sorted(public_reads - set(READ_CALLS)):
+        problems.append(f"{name}: no sample arguments in READ_CALLS")
+
+    with db.connection() as conn:
+        for name, sql in collect_statements(db):
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            print(f"\n{name}")
+            for row in plan:
+                print(f"    {row[3]}")
+            for scan in find_full_scans(plan, sql):
+                problems.append(f"{name}: {scan}")
+
+    print("\n" + "=" * 50)
+    if problems:
+        print("❌ Query plan problems:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+
+    print("✅ No full scans on large tables")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Consistency check for the materialized stats counters, revenue rollup
+and complaint search index
+
+Recounts every counter from the base tables and compares it with the
+stats table kept by triggers, then does the same for the monthly revenue
+rollup and the complaint full-text index. Pass --rebuild to overwrite
+drifted counters, rollup rows and the search index with fresh values.
+
+Run: python check_stats.py [--rebuild] [database]
+"""
+
+import argparse
+import sys
+
+from simple_database import SimplePGDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the trigger-maintained stats counters, revenue rollup and search index")
+    parser.add_argument("database", nargs="?", default="pg_simple.db")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild counters, rollup rows and the search index if they have drifted")
+    args = parser.parse_args()
+
+    db = SimplePGDatabase(args.database)
+    mismatches = db.check_stats(rebuild=args.rebuild)
+    revenue_mismatches = db.check_revenue_rollup(rebuild=args.rebuild)
+    search_mismatches = db.check_complaint_search(rebuild=args.rebuild)
+
+    if mismatches:
+        print("❌ Stats counters out of sync:")
+        for name, (stored, actual) in sorted(mismatches.items()):
+            print(f"  - {name}: stored {stored}, actual {actual}")
+    else:
+        print("✅ Stats counters match the base tables")
+
+    if revenue_mismatches:
+        print("❌ Revenue rollup out of sync:")
+        for (month, method, room_type), (stored, actual) in sorted(revenue_mismatches.items()):
+            print(f"  - {month} {method} {room_type}: stored {stored[0]} payments ₹{stored[1]:,.2f}, "
+                  f"actual {actual[0]} payments ₹{actual[1]:,.2f}")
+    else:
+        print("✅ Revenue rollup matches the payments")
+
+    if search_mismatches:
+        print("❌ Complaint search index out of sync:")
+        for problem, count in sorted(search_mismatches.items()):
+            print(f"  - {count} complaints {problem}")
+    else:
+        print("✅ Complaint search index matches the complaints")
+
+    if not mismatches and not revenue_mismatches and not search_mismatches:
+        return 0
+    if args.rebuild:
+        print("🔧 Rebuilt from the base tables")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
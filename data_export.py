@@ -0,0 +1,140 @@
+"""
+Streaming CSV and Parquet export of payments, renters and complaints
+
+Rows come from SimplePGDatabase.iter_export in chunks of
+EXPORT_CHUNK_SIZE and each chunk is written before the next is fetched.
+Memory use stays flat no matter how large the table is. Parquet needs
+pyarrow (pip install pyarrow); CSV works with the standard library.
+
+Run: python data_export.py payments [--format csv|parquet] [--output FILE] [--database FILE]
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+from simple_database import EXPORTS, get_database
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def parquet_available():
+    """Whether pyarrow is installed"""
+    return pa is not None
+
+
+def export_columns(name):
+    """Column names of an export"""
+    return [column for column, _ in EXPORTS[name][0]]
+
+
+def write_csv(db, name, f):
+    """Stream an export as CSV into a text file object; returns the row count"""
+    writer = csv.writer(f)
+    writer.writerow(export_columns(name))
+    count = 0
+    for rows in db.iter_export(name):
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+# SQLite hands back 0/1 for booleans and whatever type a value was stored
+# with; pyarrow will not coerce, so convert to the column's kind. None stays null.
+CONVERTERS = {'int': int, 'real': float, 'text': str, 'bool': bool}
+
+
+def _arrow_schema(name):
+    kinds = {'int': pa.int64(), 'real': pa.float64(), 'text': pa.string(), 'bool': pa.bool_()}
+    return pa.schema([(column, kinds[kind]) for column, kind in EXPORTS[name][0]])
+
+
+def _convert(values, kind):
+    convert = CONVERTERS[kind]
+    return [None if value is None else convert(value) for value in values]
+
+
+def write_parquet(db, name, f):
+    """Stream an export as Parquet into a path or binary file object, one row group per chunk"""
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+    schema = _arrow_schema(name)
+    kinds = [kind for _, kind in EXPORTS[name][0]]
+    count = 0
+    with pq.ParquetWriter(f, schema) as writer:
+        for rows in db.iter_export(name):
+            columns = list(zip(*rows))
+            batch = pa.record_batch(
+                [pa.array(_convert(values, kind), type=field.type)
+                 for values, kind, field in zip(columns, kinds, schema)],
+                schema=schema
+            )
+            writer.write_batch(batch)
+            count += len(rows)
+    return count
+
+
+def export_to_file(db, name, file_format, path):
+    """Write an export to a file on disk; returns the row count. A failed export leaves no file behind"""
+    try:
+        if file_format == "parquet":
+            return write_parquet(db, name, path)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            return write_csv(db, name, f)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def export_to_buffer(db, name, file_format, buffer):
+    """Write an export into a binary file object such as a temporary file; returns the row count"""
+    if file_format == "parquet":
+        return write_parquet(db, name, buffer)
+    text = io.TextIOWrapper(buffer, newline="", encoding="utf-8", write_through=True)
+    try:
+        return write_csv(db, name, text)
+    finally:
+        # Leave the underlying buffer open for the caller
+        text.detach()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("export", choices=sorted(EXPORTS))
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", help="defaults to <export>.<format>")
+    parser.add_argument("--database", default="pg_simple.db")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not parquet_available():
+        print("❌ Parquet export needs pyarrow: pip install pyarrow")
+        return 1
+
+    output = args.output or f"{args.export}.{args.format}"
+    db = get_database(args.database)
+
+    started = time.perf_counter()
+    try:
+        count = export_to_file(db, args.export, args.format, output)
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported {count:,} {args.export} rows to {output} in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
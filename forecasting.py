@@ -0,0 +1,112 @@
+"""
+Revenue forecast and occupancy projection
+
+Revenue: monthly revenue per room type over the last `lookback` complete
+months comes from the revenue rollup. One straight line is fitted per
+room type, with least squares run for every room type at once over a
+NumPy matrix, and extended over the next `months` months from the
+current one. It is capped at the rent of every bed in that room type.
+
+Occupancy: the average number of current occupants who moved in per
+month over the same window is added to today's occupied beds, capped at
+each room type's bed count. This assumes current renters stay.
+
+Results are cached in query_cache like the database reads, so reruns
+reuse them until a payment, bed, room or renter changes.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from query_cache import cached_call
+
+FORECAST_TABLES = ('payments', 'revenue', 'beds', 'rooms', 'renters')
+
+
+def month_range(first_month, count):
+    """count consecutive YYYY-MM labels starting at first_month"""
+    start = int(first_month[:4]) * 12 + int(first_month[5:7]) - 1
+    return [f"{i // 12}-{i % 12 + 1:02d}" for i in range(start, start + count)]
+
+
+def shift_month(month, offset):
+    """The YYYY-MM label offset months after (or before, if negative) month"""
+    index = int(month[:4]) * 12 + int(month[5:7]) - 1 + offset
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def linear_trend(history, steps):
+    """Fit a line to each row of history (groups x months) and extend it by steps months, floored at 0"""
+    history = np.asarray(history, dtype=float)
+    n = history.shape[1]
+    x = np.arange(n, dtype=float)
+    centered = x - x.mean()
+    if n > 1:
+        slope = history @ centered / (centered @ centered)
+    else:
+        slope = np.zeros(history.shape[0])
+    intercept = history.mean(axis=1) - slope * x.mean()
+    future = np.arange(n, n + steps, dtype=float)
+    return np.clip(intercept[:, None] + slope[:, None] * future[None, :], 0, None)
+
+
+def _forecast(db, months, lookback, current_month):
+    history_months = month_range(shift_month(current_month, -lookback), lookback)
+    future_months = month_range(current_month, months)
+
+    # Revenue per room type x month, zero for months without payments
+    rollup = pd.DataFrame(
+        db.get_revenue_rollup(history_months[0], history_months[-1]),
+        columns=['Month', 'Method', 'Room Type', 'Payments', 'Amount']
+    )
+    revenue = (
+        rollup.pivot_table(index='Room Type', columns='Month', values='Amount', aggfunc='sum')
+        .reindex(columns=history_months, fill_value=0)
+        .fillna(0)
+    )
+    rooms = pd.DataFrame(db.get_all_rooms(), columns=['ID', 'Room', 'Room Type', 'Sharing', 'Rent'])
+    full_rent = (rooms['Sharing'] * rooms['Rent']).groupby(rooms['Room Type']).sum()
+    ceiling = full_rent.reindex(revenue.index).fillna(np.inf).to_numpy()
+    projected = np.minimum(linear_trend(revenue.to_numpy(), months), ceiling[:, None])
+
+    revenue_frame = pd.concat([
+        revenue.stack().rename('Amount').reset_index().assign(Kind='Actual'),
+        pd.DataFrame(projected, index=revenue.index, columns=future_months)
+        .stack().rename('Amount').reset_index().rename(columns={'level_1': 'Month'})
+        .assign(Kind='Forecast')
+    ], ignore_index=True)
+
+    # Occupancy per room type: today's beds plus the average monthly move-in rate
+    report = pd.DataFrame(db.get_occupancy_report(), columns=['Room', 'Room Type', 'Total', 'Occupied', 'Empty'])
+    beds = report.groupby('Room Type')[['Total', 'Occupied']].sum()
+    move_ins = pd.DataFrame(db.get_move_ins(history_months[0]), columns=['Month', 'Room Type', 'Renters'])
+    move_ins = move_ins[move_ins['Month'] <= history_months[-1]]
+    fill_rate = (
+        move_ins.groupby('Room Type')['Renters'].sum().reindex(beds.index, fill_value=0) / lookback
+    )
+
+    steps = np.arange(1, months + 1)
+    occupied = np.minimum(
+        beds['Total'].to_numpy()[:, None],
+        beds['Occupied'].to_numpy()[:, None] + fill_rate.to_numpy()[:, None] * steps[None, :]
+    )
+    occupancy_frame = (
+        pd.DataFrame(occupied, index=beds.index, columns=future_months)
+        .stack().rename('Occupied').reset_index().rename(columns={'level_1': 'Month'})
+        .merge(beds['Total'].rename('Beds').reset_index(), on='Room Type')
+    )
+    occupancy_frame['Occupancy %'] = (occupancy_frame['Occupied'] / occupancy_frame['Beds'] * 100).round(1)
+
+    return {'revenue': revenue_frame, 'occupancy': occupancy_frame}
+
+
+def forecast(db, months=6, lookback=12):
+    """Revenue forecast and occupancy projection for the next months, as DataFrames
+
+    Returns {'revenue': Month, Room Type, Amount, Kind (Actual/Forecast),
+             'occupancy': Month, Room Type, Occupied, Beds, Occupancy %}.
+    """
+    current_month = date.today().strftime("%Y-%m")
+    return cached_call(db, FORECAST_TABLES, _forecast, months, lookback, current_month)
@@ -4,13 +4,13 @@ This ensures data is available even after Streamlit Cloud restarts
 """
 
 import streamlit as st
-from simple_database import SimplePGDatabase
+from simple_database import get_database
 from datetime import date, timedelta
 
 @st.cache_resource
 def initialize_database():
     """Initialize database with test data if empty"""
-    db = SimplePGDatabase()
+    db = get_database()
     
     # Check if data already exists
     rooms = db.get_all_rooms()
@@ -30,8 +30,7 @@ def initialize_database():
         ("106", "Non-AC", 5, 4500),
     ]
     
-    for room_number, room_type, sharing, rent in rooms_data:
-        db.add_room(room_number, room_type, sharing, rent)
+    db.add_rooms(rooms_data)
     
     # 2. Add Renters
     renters_data = [
@@ -62,8 +61,7 @@ def initialize_database():
         (8, 4, 2),  # Sanjay -> Room 104, Bed 2
     ]
     
-    for renter_id, room_id, bed_number in bed_allocations:
-        db.allocate_bed(renter_id, room_id, bed_number)
+    db.allocate_beds(bed_allocations)
     
     # 4. Add Payments
     today = date.today()
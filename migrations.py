@@ -0,0 +1,670 @@
+"""
+Versioned schema migrations for the PG Management database
+
+Each migration has a number, a schema step and an optional backfill.
+The schema step runs in one transaction together with the
+PRAGMA user_version bump. The backfill updates existing rows in small
+batches, committing after each one so the SQLite write lock is only held
+briefly while the app keeps serving requests.
+
+On startup the app applies only the schema steps and hands backfills to
+a background thread (start_backfills), so no page waits for them. Code
+that reads backfilled columns must cope with rows not filled in yet.
+
+Run `python migrations.py` to apply pending migrations and finish their
+backfills ahead of a deploy.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+BACKFILL_BATCH_SIZE = 500
+BACKFILL_PAUSE_SECONDS = 0.01
+
+
+def make_renter_unique_id(renter_id, join_date):
+    """Build the renter's public ID, e.g. RN25010042 for renter 42 joining Jan 2025"""
+    join_date = str(join_date)
+    return f"RN{join_date[2:4]}{join_date[5:7]}{renter_id:04d}"
+
+
+# MIGRATION STEPS
+def _create_base_tables(db, cursor):
+    db.create_tables(cursor)
+
+
+def _add_renter_documents(db, cursor):
+    cursor.execute("ALTER TABLE renters ADD COLUMN unique_id TEXT")
+    cursor.execute("ALTER TABLE renters ADD COLUMN aadhaar_path TEXT")
+    cursor.execute("ALTER TABLE renters ADD COLUMN pan_path TEXT")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_renters_unique_id ON renters (unique_id)")
+
+
+def _backfill_renter_unique_ids(cursor, last_id, batch_size):
+    cursor.execute('''
+        SELECT renter_id, join_date FROM renters
+        WHERE renter_id > ? AND unique_id IS NULL
+        ORDER BY renter_id
+        LIMIT ?
+    ''', (last_id, batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    cursor.executemany(
+        "UPDATE renters SET unique_id = ? WHERE renter_id = ?",
+        [(make_renter_unique_id(renter_id, join_date), renter_id) for renter_id, join_date in rows]
+    )
+    return rows[-1][0]
+
+
+def _add_query_indexes(db, cursor):
+    for statement in QUERY_INDEXES:
+        cursor.execute(statement)
+
+
+# Secondary indexes for the hot read paths in SimplePGDatabase.
+# The complaint triage index matches the ORDER BY of get_all_complaints
+# expression for expression, so SQLite can walk it instead of sorting.
+QUERY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_renters_name ON renters (name)",
+    "CREATE INDEX IF NOT EXISTS idx_renters_active ON renters (is_active)",
+    "CREATE INDEX IF NOT EXISTS idx_beds_renter ON beds (renter_id)",
+    "CREATE INDEX IF NOT EXISTS idx_beds_occupied ON beds (renter_id) WHERE is_occupied = TRUE",
+    "CREATE INDEX IF NOT EXISTS idx_payments_date ON payments (payment_date)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_renter_date ON payments (renter_id, payment_date)",
+    "CREATE INDEX IF NOT EXISTS idx_complaints_status ON complaints (status)",
+    "CREATE INDEX IF NOT EXISTS idx_complaints_renter_date ON complaints (renter_id, created_date)",
+    '''
+    CREATE INDEX IF NOT EXISTS idx_complaints_triage ON complaints (
+        CASE status WHEN 'Open' THEN 1 WHEN 'In Progress' THEN 2 WHEN 'Resolved' THEN 3 END,
+        CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 END,
+        created_date DESC
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_notifications_read_date ON notifications (is_read, created_date DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications (created_date) WHERE is_read = 0",
+]
+
+
+def _add_stats_counters(db, cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    for statement in STATS_TRIGGERS:
+        cursor.execute(statement)
+    rebuild_stats(cursor)
+
+
+def _bump(name, delta):
+    """Trigger body statement adding delta to a stats counter"""
+    return (f"INSERT INTO stats (name, value) VALUES ({name}, {delta}) "
+            f"ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;")
+
+
+# Exact counters behind the dashboard and complaint stats, kept current by
+# triggers. COALESCE(x = TRUE, 0) mirrors "WHERE x = TRUE" in the queries
+# below, so NULL flags count the same way in both places.
+STATS_QUERIES = {
+    'total_rooms': "SELECT COUNT(*) FROM rooms",
+    'total_beds': "SELECT COUNT(*) FROM beds",
+    'occupied_beds': "SELECT COUNT(*) FROM beds WHERE is_occupied = TRUE",
+    'active_renters': "SELECT COUNT(*) FROM renters WHERE is_active = TRUE",
+    'unread_notifications': "SELECT COUNT(*) FROM notifications WHERE is_read = 0",
+    'complaints_total': "SELECT COUNT(*) FROM complaints",
+}
+
+# Complaint counts per status are stored as 'complaints_status:<status>'
+COMPLAINT_STATUS_PREFIX = 'complaints_status:'
+
+STATS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_rooms_insert AFTER INSERT ON rooms BEGIN
+        {_bump("'total_rooms'", 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_rooms_delete AFTER DELETE ON rooms BEGIN
+        {_bump("'total_rooms'", -1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_beds_insert AFTER INSERT ON beds BEGIN
+        {_bump("'total_beds'", 1)}
+        {_bump("'occupied_beds'", "COALESCE(NEW.is_occupied = TRUE, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_beds_delete AFTER DELETE ON beds BEGIN
+        {_bump("'total_beds'", -1)}
+        {_bump("'occupied_beds'", "-COALESCE(OLD.is_occupied = TRUE, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_beds_update AFTER UPDATE OF is_occupied ON beds BEGIN
+        {_bump("'occupied_beds'", "COALESCE(NEW.is_occupied = TRUE, 0) - COALESCE(OLD.is_occupied = TRUE, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_renters_insert AFTER INSERT ON renters BEGIN
+        {_bump("'active_renters'", "COALESCE(NEW.is_active = TRUE, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_renters_delete AFTER DELETE ON renters BEGIN
+        {_bump("'active_renters'", "-COALESCE(OLD.is_active = TRUE, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_renters_update AFTER UPDATE OF is_active ON renters BEGIN
+        {_bump("'active_renters'", "COALESCE(NEW.is_active = TRUE, 0) - COALESCE(OLD.is_active = TRUE, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_complaints_insert AFTER INSERT ON complaints BEGIN
+        {_bump("'complaints_total'", 1)}
+        {_bump(f"'{COMPLAINT_STATUS_PREFIX}' || NEW.status", 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_complaints_delete AFTER DELETE ON complaints BEGIN
+        {_bump("'complaints_total'", -1)}
+        {_bump(f"'{COMPLAINT_STATUS_PREFIX}' || OLD.status", -1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_complaints_update AFTER UPDATE OF status ON complaints
+    WHEN NEW.status IS NOT OLD.status BEGIN
+        {_bump(f"'{COMPLAINT_STATUS_PREFIX}' || OLD.status", -1)}
+        {_bump(f"'{COMPLAINT_STATUS_PREFIX}' || NEW.status", 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_notifications_insert AFTER INSERT ON notifications BEGIN
+        {_bump("'unread_notifications'", "COALESCE(NEW.is_read = 0, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_notifications_delete AFTER DELETE ON notifications BEGIN
+        {_bump("'unread_notifications'", "-COALESCE(OLD.is_read = 0, 0)")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_notifications_update AFTER UPDATE OF is_read ON notifications BEGIN
+        {_bump("'unread_notifications'", "COALESCE(NEW.is_read = 0, 0) - COALESCE(OLD.is_read = 0, 0)")}
+    END""",
+]
+
+
+def compute_stats(cursor):
+    """Count every stats counter from the base tables"""
+    counts = {name: cursor.execute(query).fetchone()[0] for name, query in STATS_QUERIES.items()}
+    cursor.execute("SELECT status, COUNT(*) FROM complaints GROUP BY status")
+    for status, count in cursor.fetchall():
+        counts[f"{COMPLAINT_STATUS_PREFIX}{status}"] = count
+    return counts
+
+
+def rebuild_stats(cursor):
+    """Replace every stats counter with a fresh count from the base tables"""
+    counts = compute_stats(cursor)
+    cursor.execute("DELETE FROM stats")
+    cursor.executemany("INSERT INTO stats (name, value) VALUES (?, ?)", counts.items())
+    return counts
+
+
+def _add_payment_month_index(db, cursor):
+    # Covers month-range totals in get_payments_summary without touching the table
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_month ON payments (month_year, amount)")
+
+
+def _add_complaint_category_index(db, cursor):
+    # Category and date filters of get_complaints_page / get_complaints_count
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_complaints_category ON complaints (category, created_date)")
+
+
+# Tables whose writes other processes must hear about (see query_cache.py).
+# 'stats' has no trigger; check_stats bumps it after a rebuild.
+CHANGE_TRACKED_TABLES = ['rooms', 'beds', 'renters', 'payments', 'complaints', 'notifications']
+
+
+def _add_change_sequences(db, cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_changes (
+            table_name TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.executemany(
+        "INSERT OR IGNORE INTO table_changes (table_name, seq) VALUES (?, 0)",
+        [(table,) for table in CHANGE_TRACKED_TABLES + ['stats']]
+    )
+    for table in CHANGE_TRACKED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_changes_{table}_{event.lower()}
+                AFTER {event} ON {table} BEGIN
+                    UPDATE table_changes SET seq = seq + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+
+def _add_unique_bed_per_renter(db, cursor):
+    # Earlier races could leave a renter on two beds; keep the first bed and
+    # free the others so the unique index can be built
+    cursor.execute('''
+        UPDATE beds SET is_occupied = FALSE, renter_id = NULL
+        WHERE is_occupied = TRUE AND renter_id IS NOT NULL AND bed_id NOT IN (
+            SELECT MIN(bed_id) FROM beds
+            WHERE is_occupied = TRUE AND renter_id IS NOT NULL
+            GROUP BY renter_id
+        )
+    ''')
+    # Same columns and predicate as idx_beds_occupied, now enforced as unique
+    cursor.execute("DROP INDEX IF EXISTS idx_beds_occupied")
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_beds_renter_occupied
+        ON beds (renter_id) WHERE is_occupied = TRUE
+    ''')
+
+
+# Payments are attributed to the room type the renter had when paying
+PAYMENT_ROOM_TYPE_SQL = '''COALESCE((
+        SELECT rm.room_type FROM beds b JOIN rooms rm ON rm.room_id = b.room_id
+        WHERE b.renter_id = {renter} AND b.is_occupied = TRUE
+    ), 'Unallocated')'''
+
+
+def _bump_revenue(row, sign):
+    """Trigger body statement adding (sign=1) or removing (sign=-1) a payment row from the rollup"""
+    return (f"INSERT INTO revenue_rollup (month_year, payment_method, room_type, payment_count, amount) "
+            f"SELECT {row}.month_year, COALESCE({row}.payment_method, 'Unknown'), {row}.room_type, "
+            f"{sign}, {sign} * {row}.amount WHERE {row}.room_type IS NOT NULL "
+            f"ON CONFLICT(month_year, payment_method, room_type) DO UPDATE SET "
+            f"payment_count = payment_count + excluded.payment_count, amount = amount + excluded.amount;")
+
+
+# A new payment gets its room type from a follow-up UPDATE, which is what
+# adds it to the rollup; rows still waiting for the backfill are left out.
+REVENUE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_payments_room_type AFTER INSERT ON payments
+    WHEN NEW.room_type IS NULL BEGIN
+        UPDATE payments SET room_type = {PAYMENT_ROOM_TYPE_SQL.format(renter='NEW.renter_id')}
+        WHERE payment_id = NEW.payment_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_revenue_payments_insert AFTER INSERT ON payments
+    WHEN NEW.room_type IS NOT NULL BEGIN
+        {_bump_revenue('NEW', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_revenue_payments_delete AFTER DELETE ON payments BEGIN
+        {_bump_revenue('OLD', -1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_revenue_payments_update
+    AFTER UPDATE OF month_year, amount, payment_method, room_type ON payments BEGIN
+        {_bump_revenue('OLD', -1)}
+        {_bump_revenue('NEW', 1)}
+    END""",
+]
+
+REVENUE_ROLLUP_QUERY = '''
+    SELECT month_year, COALESCE(payment_method, 'Unknown'), room_type, COUNT(*), SUM(amount)
+    FROM payments
+    WHERE room_type IS NOT NULL
+    GROUP BY month_year, COALESCE(payment_method, 'Unknown'), room_type
+'''
+
+
+def compute_revenue_rollup(cursor):
+    """Aggregate payments into {(month_year, payment_method, room_type): (count, amount)}"""
+    cursor.execute(REVENUE_ROLLUP_QUERY)
+    return {(month, method, room_type): (count, amount) for month, method, room_type, count, amount in cursor.fetchall()}
+
+
+def rebuild_revenue_rollup(cursor):
+    """Replace the revenue rollup with a fresh aggregate of payments"""
+    cursor.execute("DELETE FROM revenue_rollup")
+    cursor.execute(f'''
+        INSERT INTO revenue_rollup (month_year, payment_method, room_type, payment_count, amount)
+        {REVENUE_ROLLUP_QUERY}
+    ''')
+
+
+def _add_revenue_rollup(db, cursor):
+    cursor.execute("ALTER TABLE payments ADD COLUMN room_type TEXT")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS revenue_rollup (
+            month_year TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            room_type TEXT NOT NULL,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            amount REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (month_year, payment_method, room_type)
+        )
+    ''')
+    for statement in REVENUE_TRIGGERS:
+        cursor.execute(statement)
+    # Lets other processes drop cached reports after a rebuild
+    cursor.execute("INSERT OR IGNORE INTO table_changes (table_name, seq) VALUES ('revenue', 0)")
+
+
+def _backfill_payment_room_types(cursor, last_id, batch_size):
+    # Each filled row enters the rollup through trg_revenue_payments_update
+    cursor.execute('''
+        SELECT payment_id FROM payments
+        WHERE payment_id > ? AND room_type IS NULL
+        ORDER BY payment_id
+        LIMIT ?
+    ''', (last_id, batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    cursor.execute(f'''
+        UPDATE payments SET room_type = {PAYMENT_ROOM_TYPE_SQL.format(renter='payments.renter_id')}
+        WHERE payment_id BETWEEN ? AND ? AND room_type IS NULL
+    ''', (rows[0][0], rows[-1][0]))
+    return rows[-1][0]
+
+
+# Full-text index over the complaint text. It keeps its own copy of the
+# columns so the update and delete triggers can address rows by rowid,
+# whether or not the backfill has reached them yet.
+COMPLAINT_SEARCH_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_complaints_fts_insert AFTER INSERT ON complaints BEGIN
+        INSERT INTO complaints_fts (rowid, title, description, admin_response)
+        VALUES (NEW.complaint_id, NEW.title, NEW.description, NEW.admin_response);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_complaints_fts_delete AFTER DELETE ON complaints BEGIN
+        DELETE FROM complaints_fts WHERE rowid = OLD.complaint_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_complaints_fts_update
+    AFTER UPDATE OF title, description, admin_response ON complaints BEGIN
+        UPDATE complaints_fts
+        SET title = NEW.title, description = NEW.description, admin_response = NEW.admin_response
+        WHERE rowid = NEW.complaint_id;
+    END""",
+]
+
+
+def rebuild_complaint_search(cursor):
+    """Replace the complaint search index with a fresh copy of the complaints"""
+    cursor.execute("DELETE FROM complaints_fts")
+    cursor.execute('''
+        INSERT INTO complaints_fts (rowid, title, description, admin_response)
+        SELECT complaint_id, title, description, admin_response FROM complaints
+    ''')
+
+
+def _add_complaint_search(db, cursor):
+    # porter stemming so "leaking" finds "leak"
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts USING fts5(
+            title, description, admin_response,
+            tokenize = 'porter unicode61'
+        )
+    ''')
+    for statement in COMPLAINT_SEARCH_TRIGGERS:
+        cursor.execute(statement)
+
+
+def _backfill_complaint_search(cursor, last_id, batch_size):
+    # Complaints added since the schema step are already indexed by the trigger
+    cursor.execute('''
+        SELECT complaint_id FROM complaints
+        WHERE complaint_id > ?
+        ORDER BY complaint_id
+        LIMIT ?
+    ''', (last_id, batch_size))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    cursor.execute('''
+        INSERT INTO complaints_fts (rowid, title, description, admin_response)
+        SELECT c.complaint_id, c.title, c.description, c.admin_response
+        FROM complaints c
+        WHERE c.complaint_id BETWEEN ? AND ?
+          AND NOT EXISTS (SELECT 1 FROM complaints_fts f WHERE f.rowid = c.complaint_id)
+    ''', (rows[0][0], rows[-1][0]))
+    return rows[-1][0]
+
+
+def _rank_unknown_complaints_last(db, cursor):
+    # Statuses and priorities outside the known values used to rank NULL,
+    # which the keyset pages skipped; they now rank after the known ones
+    cursor.execute("DROP INDEX IF EXISTS idx_complaints_triage")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_triage ON complaints (
+            CASE status WHEN 'Open' THEN 1 WHEN 'In Progress' THEN 2 WHEN 'Resolved' THEN 3 ELSE 4 END,
+            CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 ELSE 4 END,
+            created_date DESC
+        )
+    ''')
+
+
+# Superseded by later indexes, yet still maintained on every write:
+# idx_beds_renter_occupied serves occupied-bed lookups, status filters go
+# through idx_complaints_triage, and the unread count comes from stats
+UNUSED_INDEXES = ['idx_beds_renter', 'idx_complaints_status', 'idx_notifications_unread']
+
+
+def _drop_unused_indexes(db, cursor):
+    for index in UNUSED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+# Append new migrations at the end; never renumber or edit an applied one.
+# 'schema' takes (db, cursor); 'backfill' takes (cursor, last_id, batch_size)
+# and returns the last id it processed, or None once nothing is left.
+MIGRATIONS = [
+    {
+        'version': 1,
+        'description': "Base tables and default admin",
+        'schema': _create_base_tables,
+        'backfill': None
+    },
+    {
+        'version': 2,
+        'description': "Renter unique ID and KYC document paths",
+        'schema': _add_renter_documents,
+        'backfill': _backfill_renter_unique_ids
+    },
+    {
+        'version': 3,
+        'description': "Secondary indexes for hot query paths",
+        'schema': _add_query_indexes,
+        'backfill': None
+    },
+    {
+        'version': 4,
+        'description': "Trigger-maintained stats counters",
+        'schema': _add_stats_counters,
+        'backfill': None
+    },
+    {
+        'version': 5,
+        'description': "Payment month index for paginated history",
+        'schema': _add_payment_month_index,
+        'backfill': None
+    },
+    {
+        'version': 6,
+        'description': "Complaint category index for filtered listing",
+        'schema': _add_complaint_category_index,
+        'backfill': None
+    },
+    {
+        'version': 7,
+        'description': "Per-table change sequences for cross-process cache invalidation",
+        'schema': _add_change_sequences,
+        'backfill': None
+    },
+    {
+        'version': 8,
+        'description': "One occupied bed per renter",
+        'schema': _add_unique_bed_per_renter,
+        'backfill': None
+    },
+    {
+        'version': 9,
+        'description': "Monthly revenue rollup by payment method and room type",
+        'schema': _add_revenue_rollup,
+        'backfill': _backfill_payment_room_types
+    },
+    {
+        'version': 10,
+        'description': "Full-text search index over complaints",
+        'schema': _add_complaint_search,
+        'backfill': _backfill_complaint_search
+    },
+    {
+        'version': 11,
+        'description': "Complaint triage index ranks unknown status and priority last",
+        'schema': _rank_unknown_complaints_last,
+        'backfill': None
+    },
+    {
+        'version': 12,
+        'description': "Drop indexes no query uses any more",
+        'schema': _drop_unused_indexes,
+        'backfill': None
+    },
+]
+
+LATEST_VERSION = MIGRATIONS[-1]['version']
+
+
+# ENGINE
+def _ensure_migrations_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_date DATETIME NOT NULL,
+            backfill_completed_date DATETIME
+        )
+    ''')
+
+
+def get_schema_version(db):
+    """Get the schema version recorded in the database file"""
+    with db.connection() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def get_pending_backfills(db):
+    """Get versions of applied migrations whose backfill has not finished"""
+    with db.connection() as conn:
+        table = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+        ).fetchone()
+        if not table:
+            return []
+        rows = conn.execute('''
+            SELECT version FROM schema_migrations
+            WHERE backfill_completed_date IS NULL
+            ORDER BY version
+        ''').fetchall()
+    return [row[0] for row in rows]
+
+
+def _apply_schema_step(db, migration):
+    """Apply one migration's schema step; returns False if another process already did"""
+    with db.connection() as conn:
+        # Take the write lock before re-reading the version so concurrent
+        # workers cannot both run the same ALTER TABLE
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= migration['version']:
+            return False
+
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        migration['schema'](db, cursor)
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute('''
+            INSERT OR REPLACE INTO schema_migrations
+                (version, description, applied_date, backfill_completed_date)
+            VALUES (?, ?, ?, ?)
+        ''', (migration['version'], migration['description'], now,
+              None if migration['backfill'] else now))
+        cursor.execute(f"PRAGMA user_version = {migration['version']}")
+    return True
+
+
+def run_backfill(db, migration, batch_size=BACKFILL_BATCH_SIZE, pause=BACKFILL_PAUSE_SECONDS):
+    """Run a migration's backfill in committed batches and mark it complete"""
+    batches = 0
+    last_id = 0
+
+    while True:
+        with db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = migration['backfill'](conn.cursor(), last_id, batch_size)
+        if last_id is None:
+            break
+        batches += 1
+        # Give other writers a chance at the lock between batches
+        time.sleep(pause)
+
+    with db.connection() as conn:
+        conn.execute('''
+            UPDATE schema_migrations SET backfill_completed_date = ?
+            WHERE version = ?
+        ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), migration['version']))
+    return batches
+
+
+def apply_schema(db):
+    """Apply the schema steps of pending migrations in order; returns the versions applied"""
+    if get_schema_version(db) >= LATEST_VERSION:
+        return []
+
+    applied = []
+    for migration in MIGRATIONS:
+        if _apply_schema_step(db, migration):
+            applied.append(migration['version'])
+    return applied
+
+
+def run_pending_backfills(db, batch_size=BACKFILL_BATCH_SIZE, pause=BACKFILL_PAUSE_SECONDS):
+    """Finish every outstanding backfill; returns the versions it ran"""
+    migrations_by_version = {m['version']: m for m in MIGRATIONS}
+    ran = []
+    for version in get_pending_backfills(db):
+        migration = migrations_by_version.get(version)
+        if migration and migration['backfill']:
+            run_backfill(db, migration, batch_size, pause)
+            ran.append(version)
+    return ran
+
+
+def migrate(db, batch_size=BACKFILL_BATCH_SIZE, pause=BACKFILL_PAUSE_SECONDS):
+    """Apply pending migrations in order, then finish any outstanding backfills"""
+    applied = apply_schema(db)
+    run_pending_backfills(db, batch_size, pause)
+    return applied
+
+
+# One backfill thread per database file in this process
+_backfill_threads = {}
+_backfill_threads_lock = threading.Lock()
+
+
+def start_backfills(db):
+    """Run outstanding backfills on a background thread; returns it, or None if none are pending
+
+    Backfill batches are idempotent, so a thread in another process
+    working on the same database only competes for the write lock.
+    """
+    with _backfill_threads_lock:
+        thread = _backfill_threads.get(db.db_key)
+        if thread is not None and thread.is_alive():
+            return thread
+        if not get_pending_backfills(db):
+            return None
+        thread = threading.Thread(
+            target=run_pending_backfills, args=(db,), name="pg-backfill", daemon=True
+        )
+        _backfill_threads[db.db_key] = thread
+        thread.start()
+        return thread
+
+
+if __name__ == "__main__":
+    import sys
+    from simple_database import SimplePGDatabase
+
+    db_name = sys.argv[1] if len(sys.argv) > 1 else "pg_simple.db"
+    db = SimplePGDatabase(db_name)
+
+    print(f"📦 {db_name}: schema version {get_schema_version(db)} (latest {LATEST_VERSION})")
+    pending = get_pending_backfills(db)
+    if pending:
+        print(f"⏳ Finishing backfills: {pending}")
+        # Opening the database started them in the background; wait for that thread
+        thread = start_backfills(db)
+        if thread is not None:
+            thread.join()
+        pending = get_pending_backfills(db)
+    if pending:
+        print(f"⚠️  Unfinished backfills: {pending}")
+    else:
+        print("✅ Schema is up to date")
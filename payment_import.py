@@ -0,0 +1,223 @@
+"""
+Bulk payment ingestion from bank and UPI statements
+
+Reads a statement CSV and keeps only the credit rows. A row counts as a
+debit, and is skipped, in any of these cases:
+- its amount is negative;
+- it has no value in a separate credit column;
+- a Dr/Cr type column marks it as a debit;
+- its amount has a Dr suffix ("8000.00 Dr").
+
+Each credit row is matched to a renter by the phone column, or by a phone
+number or renter unique ID (RN...) found in the reference/narration
+text. The matched payments are
+recorded in one transaction through SimplePGDatabase.add_payments.
+Payments already recorded with the same amount are skipped. A different
+amount is reported as a conflict, and only replaced with --overwrite.
+
+Column names are matched case-insensitively against STATEMENT_COLUMNS,
+which covers the usual bank export headings. The month defaults to the
+month of the transaction date. When a statement has both a credit/deposit
+column and a combined amount column, the credit column is used.
+
+Run: python payment_import.py statement.csv [--database FILE] [--overwrite]
+"""
+
+import argparse
+import csv
+import io
+import re
+import sys
+import time
+from datetime import datetime
+
+from simple_database import get_database
+
+# Accepted headings for each field, lowercase
+STATEMENT_COLUMNS = {
+    'date': ('date', 'txn date', 'transaction date', 'value date', 'payment_date'),
+    'credit': ('credit', 'credit amount', 'deposit', 'deposit amount', 'cr amount'),
+    'amount': ('amount', 'txn amount', 'transaction amount'),
+    'type': ('type', 'dr/cr', 'cr/dr', 'dr / cr', 'txn type', 'transaction type', 'debit/credit'),
+    'reference': ('reference', 'narration', 'description', 'remarks', 'ref no', 'utr', 'particulars'),
+    'phone': ('phone', 'mobile', 'phone number'),
+    'method': ('method', 'mode', 'payment_method'),
+    'month': ('month', 'month_year', 'for month')
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%d-%b-%Y', '%d %b %Y', '%d-%m-%y', '%d/%m/%y')
+PHONE_PATTERN = re.compile(r'(?<!\d)(?:\+?91[- ]?)?([6-9]\d{9})(?!\d)')
+UNIQUE_ID_PATTERN = re.compile(r'\bRN\d{8}\b', re.IGNORECASE)
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+# "D", "Dr", "Debit" or "Withdrawal" as a type value or an amount suffix
+DEBIT_PATTERN = re.compile(r'(?<![a-z])(d|dr|debit|withdrawal)\b', re.IGNORECASE)
+
+
+def _parse_date(text):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(text):
+    cleaned = re.sub(r'[^\d.\-]', '', text or '')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def parse_statement(text):
+    """Parse statement CSV text or UTF-8 bytes; returns (entries, skipped)
+
+    entries are dicts with line, payment_date, amount, month_year, method,
+    phones and unique_ids; skipped are (line, reason).
+    """
+    if isinstance(text, bytes):
+        try:
+            text = text.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return [], [(0, "file is not UTF-8 text")]
+
+    reader = csv.DictReader(io.StringIO(text))
+    headings = {(name or '').strip().lower(): name for name in reader.fieldnames or []}
+    columns = {
+        field: next((headings[a] for a in aliases if a in headings), None)
+        for field, aliases in STATEMENT_COLUMNS.items()
+    }
+    # A credit/deposit column holds only credits, so it beats a combined amount
+    amount_field = 'credit' if columns['credit'] else 'amount'
+    if not columns['date'] or not columns[amount_field]:
+        return [], [(1, "statement needs a date and an amount/credit column")]
+
+    def value(record, field):
+        return (record.get(columns[field]) or '').strip() if columns[field] else ''
+
+    entries = []
+    skipped = []
+    for line, record in enumerate(reader, start=2):
+        amount_text = value(record, amount_field)
+        if DEBIT_PATTERN.search(value(record, 'type')) or DEBIT_PATTERN.search(amount_text):
+            skipped.append((line, "debit"))
+            continue
+
+        amount = _parse_amount(amount_text)
+        if amount is None or amount <= 0:
+            skipped.append((line, "not a credit"))
+            continue
+
+        payment_date = _parse_date(value(record, 'date'))
+        if payment_date is None:
+            skipped.append((line, f"unreadable date '{value(record, 'date')}'"))
+            continue
+
+        month_year = value(record, 'month') or payment_date.strftime("%Y-%m")
+        if not MONTH_PATTERN.match(month_year):
+            skipped.append((line, f"month must be YYYY-MM, got '{month_year}'"))
+            continue
+
+        reference = value(record, 'reference')
+        method = value(record, 'method') or ("UPI" if "upi" in reference.lower() else "Bank Transfer")
+        phones = PHONE_PATTERN.findall(value(record, 'phone')) or PHONE_PATTERN.findall(reference)
+        unique_ids = [uid.upper() for uid in UNIQUE_ID_PATTERN.findall(reference)]
+
+        entries.append({
+            'line': line,
+            'payment_date': payment_date.isoformat(),
+            'amount': amount,
+            'month_year': month_year,
+            'method': method,
+            'phones': phones,
+            'unique_ids': unique_ids
+        })
+    return entries, skipped
+
+
+def match_renters(db, entries):
+    """Attach renter_id and name to each entry; returns (matched, unmatched)"""
+    phones = {phone for entry in entries for phone in entry['phones']}
+    unique_ids = {uid for entry in entries for uid in entry['unique_ids']}
+    by_phone = {}
+    by_unique_id = {}
+    for renter_id, name, phone, unique_id in db.get_renters_by_contact(phones, unique_ids):
+        by_phone[phone] = (renter_id, name)
+        if unique_id:
+            by_unique_id[unique_id] = (renter_id, name)
+
+    matched = []
+    unmatched = []
+    for entry in entries:
+        # The renter unique ID is the most specific reference, so it wins over a phone number
+        candidates = [by_unique_id[uid] for uid in entry['unique_ids'] if uid in by_unique_id]
+        candidates += [by_phone[phone] for phone in entry['phones'] if phone in by_phone]
+        if not candidates:
+            unmatched.append((entry['line'], "no renter matches the phone or reference"))
+            continue
+        entry['renter_id'], entry['name'] = candidates[0]
+        matched.append(entry)
+    return matched, unmatched
+
+
+def ingest_statement(db, text, overwrite=False):
+    """Parse, match and record a statement; returns a summary dict"""
+    started = time.perf_counter()
+    entries, skipped = parse_statement(text)
+    matched, unmatched = match_renters(db, entries)
+
+    results = db.add_payments(
+        [(e['renter_id'], e['month_year'], e['amount'], e['payment_date'], e['method']) for e in matched],
+        overwrite=overwrite
+    ) if matched else []
+    elapsed = time.perf_counter() - started
+
+    counts = {'added': 0, 'updated': 0, 'duplicate': 0, 'conflict': 0, 'error': 0}
+    problems = []
+    for entry, (status, message) in zip(matched, results):
+        counts[status] += 1
+        if status in ('conflict', 'error'):
+            problems.append((entry['line'], entry['name'], message))
+
+    rows = len(entries) + len(skipped)
+    return {
+        'rows': rows,
+        'matched': len(matched),
+        'added': counts['added'],
+        'updated': counts['updated'],
+        'duplicates': counts['duplicate'],
+        'conflicts': problems,
+        'unmatched': unmatched,
+        'skipped': skipped,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("statement")
+    parser.add_argument("--database", default="pg_simple.db")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="replace recorded payments whose amount differs from the statement")
+    args = parser.parse_args()
+
+    db = get_database(args.database)
+    with open(args.statement, "rb") as f:
+        summary = ingest_statement(db, f.read(), args.overwrite)
+
+    print(f"📄 {summary['rows']:,} rows, {summary['matched']:,} matched to renters "
+          f"in {summary['seconds']:.2f}s ({summary['rows_per_second']:,.0f} rows/s)")
+    print(f"✅ Added {summary['added']:,}, updated {summary['updated']:,}, "
+          f"already recorded {summary['duplicates']:,}")
+    for line, name, message in summary['conflicts']:
+        print(f"  ⚠️  Line {line} ({name}): {message}")
+    for line, reason in summary['unmatched']:
+        print(f"  ❓ Line {line}: {reason}")
+    for line, reason in summary['skipped']:
+        print(f"  ⏭️  Line {line}: {reason}")
+    return 1 if summary['conflicts'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
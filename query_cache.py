@@ -0,0 +1,206 @@
+"""
+Process-wide read-through cache for SimplePGDatabase queries
+
+Read methods decorated with @cached_query(tables...) keep their result
+until QUERY_CACHE_TTL seconds pass or a method decorated with
+@invalidates(tables...) writes to one of those tables. Entries are keyed
+by database file, method name and arguments. Cached results are shared
+between callers, so treat them as read-only.
+
+Every table has a generation number that goes up on each invalidation.
+A reader records the generations before it queries and only stores its
+result if they are unchanged afterwards. Without that, a read racing a
+write could put pre-write data back into the cache.
+
+Writes from other processes (other Streamlit workers on the same file)
+are picked up through the table_changes sequences, which triggers bump on
+every write. Before serving a cached read, the cache polls those
+sequences, at most once per PG_CHANGE_POLL_INTERVAL seconds, and
+invalidates any table whose sequence moved.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+QUERY_CACHE_TTL = float(os.environ.get('PG_QUERY_CACHE_TTL', 30))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get('PG_QUERY_CACHE_MAX_ENTRIES', 1024))
+CHANGE_POLL_INTERVAL = float(os.environ.get('PG_CHANGE_POLL_INTERVAL', 1.0))
+
+
+class QueryCache:
+    """LRU cache of query results with TTL and per-table invalidation"""
+
+    def __init__(self, ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES,
+                 poll_interval=CHANGE_POLL_INTERVAL):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.poll_interval = poll_interval
+        self.enabled = True
+        self._entries = OrderedDict()      # key -> (expires_at, db_key, tables, value)
+        self._keys_by_table = {}           # (db_key, table) -> set of keys
+        self._generations = {}             # (db_key, table) -> int
+        self._seen_sequences = {}          # db_key -> {table: seq}
+        self._last_poll = {}               # db_key -> monotonic time
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'stale_skips': 0,
+            'change_polls': 0,
+            'remote_invalidations': 0
+        }
+
+    def get(self, key):
+        """Return (True, value) on a fresh hit, (False, None) otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, entry[3]
+
+    def generations(self, db_key, tables):
+        """Snapshot the generation of each table before running a query"""
+        with self._lock:
+            return tuple(self._generations.get((db_key, table), 0) for table in tables)
+
+    def put(self, key, value, db_key, tables, generations):
+        """Store a result unless one of its tables was written while it was being read"""
+        with self._lock:
+            current = tuple(self._generations.get((db_key, table), 0) for table in tables)
+            if current != generations:
+                self._stats['stale_skips'] += 1
+                return
+
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, db_key, tables, value)
+            for table in tables:
+                self._keys_by_table.setdefault((db_key, table), set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def sync(self, db_key, fetch_sequences):
+        """Invalidate tables whose change sequence moved since the last poll
+
+        fetch_sequences returns {table: seq} from the table_changes table.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last_poll = self._last_poll.get(db_key)
+            if last_poll is not None and now - last_poll < self.poll_interval:
+                return
+            self._last_poll[db_key] = now
+            self._stats['change_polls'] += 1
+
+        sequences = fetch_sequences()
+
+        with self._lock:
+            seen = self._seen_sequences.get(db_key)
+            self._seen_sequences[db_key] = sequences
+        if seen is None:
+            return
+
+        changed = [table for table, seq in sequences.items() if seen.get(table) != seq]
+        if changed:
+            with self._lock:
+                self._stats['remote_invalidations'] += 1
+            self.invalidate(db_key, changed)
+
+    def invalidate(self, db_key, tables):
+        """Drop every cached result that read one of the tables"""
+        with self._lock:
+            for table in tables:
+                slot = (db_key, table)
+                self._generations[slot] = self._generations.get(slot, 0) + 1
+                for key in list(self._keys_by_table.get(slot, ())):
+                    self._remove(key)
+                    self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._entries)
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_rate'] = snapshot['hits'] / lookups if lookups else 0.0
+        return snapshot
+
+    def _remove(self, key):
+        _, db_key, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table.get((db_key, table))
+            if keys is not None:
+                keys.discard(key)
+
+
+query_cache = QueryCache()
+
+
+def cached_call(db, tables, function, *args, **kwargs):
+    """Return function(db, *args, **kwargs), cached like a read method of db that reads the tables"""
+    if not query_cache.enabled:
+        return function(db, *args, **kwargs)
+
+    query_cache.sync(db.db_key, db.get_change_sequences)
+
+    key = (db.db_key, function.__qualname__, args, tuple(sorted(kwargs.items())))
+    hit, value = query_cache.get(key)
+    if hit:
+        return value
+
+    generations = query_cache.generations(db.db_key, tables)
+    value = function(db, *args, **kwargs)
+    query_cache.put(key, value, db.db_key, tables, generations)
+    return value
+
+
+def cached_query(*tables):
+    """Cache a SimplePGDatabase read method until its TTL expires or one of its tables is written"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return cached_call(self, tables, method, *args, **kwargs)
+
+        wrapper.cached_tables = tables
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Invalidate cached reads of the tables after a SimplePGDatabase write method runs"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                query_cache.invalidate(self.db_key, tables)
+
+        wrapper.invalidated_tables = tables
+        return wrapper
+    return decorator
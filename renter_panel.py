@@ -1,14 +1,14 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from simple_database import SimplePGDatabase
+from simple_database import get_database
 import plotly.graph_objects as go
 
 def renter_dashboard():
     """Simple renter dashboard"""
     st.title("🏠 My Dashboard")
     
-    db = SimplePGDatabase()
+    db = get_database()
     renter_details = db.get_renter_details(st.session_state.user_id)
     
     if renter_details:
@@ -61,7 +61,7 @@ def my_payments():
     """Simple payment history"""
     st.title("💰 My Payments")
     
-    db = SimplePGDatabase()
+    db = get_database()
     payments = db.get_renter_payments(st.session_state.user_id)
     
     if payments:
@@ -90,7 +90,7 @@ def my_complaints():
     """Renter complaint management"""
     st.title("📝 My Complaints")
     
-    db = SimplePGDatabase()
+    db = get_database()
     
     tab1, tab2 = st.tabs(["Submit Complaint", "My Complaint History"])
     
@@ -219,7 +219,7 @@ def my_profile():
     """Editable profile view"""
     st.title("👤 My Profile")
     
-    db = SimplePGDatabase()
+    db = get_database()
     renter_details = db.get_renter_details(st.session_state.user_id)
     
     if renter_details:
@@ -0,0 +1,164 @@
+"""
+Report builds on a bounded process pool
+
+Heavy reports run in worker processes, each with a read-only
+SimplePGDatabase handle, so a long build never blocks a Streamlit script
+thread or takes the write lock. A finished result is cached under its
+data version, meaning the table_changes sequences of the tables the
+report reads, and by the current month, since the forecast counts from
+today. Every session asking for the same report gets the same result
+until one of those tables changes. Identical requests made while a build
+is running share that build. A pool left broken by a dead worker is
+replaced; if a fresh pool cannot start workers either, the report is
+built in the calling process.
+
+Pages call submit() on every rerun and poll status() until it says done:
+
+    key = jobs.submit('revenue')
+    state, value = jobs.status(key)   # ('running' | 'done' | 'failed', result or error)
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+from forecasting import FORECAST_TABLES, forecast
+from query_cache import query_cache
+from simple_database import SimplePGDatabase, get_database
+
+REPORT_WORKERS = int(os.environ.get('PG_REPORT_WORKERS', 2))
+REPORT_CACHE_ENTRIES = 32
+
+# report -> (tables it reads, builder taking (db, *args))
+REPORTS = {
+    'occupancy': (('rooms', 'beds'), lambda db: db.get_occupancy_report()),
+    'revenue': (('payments', 'revenue'), lambda db, *args: db.get_revenue_rollup(*args)),
+    'renters': (('renters',), lambda db: db.get_all_renters()),
+    'forecast': (FORECAST_TABLES, lambda db, *args: forecast(db, *args)),
+}
+
+_worker_db = None
+
+
+def _init_worker(db_name, profile):
+    global _worker_db
+    # Workers build each report once per data version; the parent caches results
+    query_cache.enabled = False
+    _worker_db = SimplePGDatabase(db_name, profile, read_only=True)
+
+
+def _build(report, args):
+    _, builder = REPORTS[report]
+    return builder(_worker_db, *args)
+
+
+class ReportJobs:
+    """Runs report builds in worker processes and caches results by data version"""
+
+    def __init__(self, db, max_workers=REPORT_WORKERS):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = self._new_executor()
+        self._running = {}               # key -> (Future, executor running it or None)
+        self._results = OrderedDict()    # key -> ('done' | 'failed', value)
+        self._lock = threading.Lock()
+
+    def _new_executor(self):
+        # spawn: forking a threaded Streamlit server can deadlock the child
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.db.db_name, self.db.pool.profile_name)
+        )
+
+    def _replace_executor(self, broken):
+        # Called with the lock held; another caller may have replaced it already
+        if self._executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+    def data_version(self, report):
+        """Current month and the change sequences of the tables a report reads"""
+        tables, _ = REPORTS[report]
+        sequences = self.db.get_change_sequences()
+        return (date.today().strftime("%Y-%m"),) + tuple(sequences.get(table, 0) for table in tables)
+
+    def submit(self, report, *args):
+        """Start a build unless one for the current data version is cached or running; returns its key"""
+        key = (report, args, self.data_version(report))
+        with self._lock:
+            if key in self._results or key in self._running:
+                return key
+
+            for _ in range(2):
+                executor = self._executor
+                try:
+                    self._running[key] = (executor.submit(_build, report, args), executor)
+                    return key
+                except BrokenProcessPool:
+                    # A worker died; later builds get a fresh pool
+                    self._replace_executor(executor)
+
+            # Even a fresh pool cannot start workers; build in this process
+            future = Future()
+            self._running[key] = (future, None)
+        _, builder = REPORTS[report]
+        try:
+            future.set_result(builder(self.db, *args))
+        except Exception as e:
+            future.set_exception(e)
+        return key
+
+    def status(self, key):
+        """('running', None), ('done', result) or ('failed', error message)"""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+            if key not in self._running:
+                return ('failed', "Unknown report job")
+            future, executor = self._running[key]
+            if not future.done():
+                return ('running', None)
+
+            del self._running[key]
+            error = future.exception()
+            if error is not None:
+                if isinstance(error, BrokenProcessPool):
+                    self._replace_executor(executor)
+                # Not cached, so the next submit retries
+                return ('failed', str(error) or type(error).__name__)
+
+            self._results[key] = ('done', future.result())
+            while len(self._results) > REPORT_CACHE_ENTRIES:
+                self._results.popitem(last=False)
+            return self._results[key]
+
+    def stats(self):
+        """Running and cached job counts"""
+        with self._lock:
+            return {'running': len(self._running), 'cached': len(self._results)}
+
+    def close(self):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_report_jobs(db=None):
+    """Shared ReportJobs for a database, so every session uses one pool and one result cache"""
+    db = db or get_database()
+    with _engines_lock:
+        engine = _engines.get(db.db_key)
+        if engine is None:
+            engine = _engines[db.db_key] = ReportJobs(db)
+        return engine
@@ -0,0 +1,125 @@
+"""
+Bulk room import from CSV or JSON
+
+CSV files need a header row with room_number, room_type, sharing_type and
+monthly_rent. JSON files hold a list of objects with the same keys. Rows
+are checked first, and every valid room is then created, beds included,
+in one transaction through SimplePGDatabase.add_rooms.
+
+Run: python room_import.py rooms.csv [database]
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+from simple_database import get_database
+
+ROOM_TYPES = ("AC", "Non-AC")
+ROOM_FIELDS = ("room_number", "room_type", "sharing_type", "monthly_rent")
+
+
+def parse_room(record):
+    """Check one record; returns (room tuple, None) or (None, error message)"""
+    missing = [field for field in ROOM_FIELDS if str(record.get(field) or "").strip() == ""]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+
+    room_number = str(record['room_number']).strip()
+    room_type = str(record['room_type']).strip()
+    if room_type not in ROOM_TYPES:
+        return None, f"room_type must be one of {', '.join(ROOM_TYPES)}"
+
+    try:
+        sharing_type = int(record['sharing_type'])
+        monthly_rent = float(record['monthly_rent'])
+    except (TypeError, ValueError):
+        return None, "sharing_type and monthly_rent must be numbers"
+    if sharing_type < 1:
+        return None, "sharing_type must be at least 1"
+    if monthly_rent <= 0:
+        return None, "monthly_rent must be greater than 0"
+
+    return (room_number, room_type, sharing_type, monthly_rent), None
+
+
+def parse_rooms(text, file_format):
+    """Parse CSV or JSON text or UTF-8 bytes; returns (rooms, errors) where errors are (line, message)"""
+    if isinstance(text, bytes):
+        try:
+            text = text.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return [], [(0, "file is not UTF-8 text")]
+
+    if file_format == "json":
+        try:
+            records = json.loads(text)
+        except ValueError as e:
+            return [], [(0, f"invalid JSON: {e}")]
+        if not isinstance(records, list):
+            return [], [(0, "expected a list of rooms")]
+        first_line = 1
+    else:
+        try:
+            records = list(csv.DictReader(io.StringIO(text)))
+        except csv.Error as e:
+            return [], [(0, f"invalid CSV: {e}")]
+        first_line = 2  # after the header
+
+    rooms = []
+    errors = []
+    for line, record in enumerate(records, start=first_line):
+        if not isinstance(record, dict):
+            errors.append((line, "expected an object with room fields"))
+            continue
+        room, error = parse_room(record)
+        if error:
+            errors.append((line, error))
+        else:
+            rooms.append(room)
+    return rooms, errors
+
+
+def import_rooms(db, text, file_format):
+    """Parse and create rooms; returns a summary dict"""
+    rooms, errors = parse_rooms(text, file_format)
+
+    started = time.perf_counter()
+    results = db.add_rooms(rooms) if rooms else []
+    elapsed = time.perf_counter() - started
+
+    added = [room for room, (success, _) in zip(rooms, results) if success]
+    skipped = [message for success, message in results if not success]
+    return {
+        'added': len(added),
+        'beds': sum(room[2] for room in added),
+        'skipped': skipped,
+        'errors': errors,
+        'seconds': elapsed
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        return 1
+
+    path = sys.argv[1]
+    db = get_database(sys.argv[2]) if len(sys.argv) > 2 else get_database()
+    file_format = "json" if os.path.splitext(path)[1].lower() == ".json" else "csv"
+    with open(path, "rb") as f:
+        summary = import_rooms(db, f.read(), file_format)
+
+    print(f"✅ Added {summary['added']} rooms with {summary['beds']} beds in {summary['seconds']:.3f}s")
+    for message in summary['skipped']:
+        print(f"  ⚠️  {message}")
+    for line, message in summary['errors']:
+        print(f"  ❌ Line {line}: {message}")
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
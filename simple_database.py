@@ -1,22 +1,370 @@
 import sqlite3
-from datetime import datetime
+import os
+import queue
+import threading
+import json
+import re
+from contextlib import contextmanager
+from urllib.request import pathname2url
+from datetime import datetime, date, timedelta
+import migrations
+from migrations import make_renter_unique_id
+from query_cache import query_cache, cached_query, invalidates
+
+
+# PRAGMA settings applied to every connection. Pick one with the
+# PG_DB_PROFILE environment variable or the profile argument.
+#
+# production - WAL lets readers run alongside a writer, NORMAL sync is
+#              crash-safe under WAL, and writers wait up to 10s for the
+#              lock instead of failing with "database is locked".
+#              Use this for the Streamlit app on a local disk.
+# compat     - rollback journal with full sync. Use on network file
+#              systems, where WAL's shared memory file does not work.
+CONNECTION_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 10000,       # ms
+        'cache_size': -64000,        # negative = KiB, i.e. 64 MB per connection
+        'mmap_size': 268435456,      # 256 MB
+        'temp_store': 'MEMORY'
+    },
+    'compat': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT'
+    },
+}
+
+DEFAULT_PROFILE = os.environ.get('PG_DB_PROFILE', 'production')
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of SQLite connections for one database file"""
+    
+    def __init__(self, db_name, max_size=8, timeout=10.0, profile=None, read_only=False):
+        self.db_name = db_name
+        self.read_only = read_only
+        self.profile_name = profile or DEFAULT_PROFILE
+        self.profile = CONNECTION_PROFILES[self.profile_name]
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'exhausted': 0,
+            'connections_created': 0,
+            'rollbacks': 0
+        }
+    
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+    
+    def open_connection(self):
+        """Open a connection with the pool's PRAGMA profile applied"""
+        profile = self.profile
+        if self.read_only:
+            # mode=ro refuses every write; the journal mode belongs to the writers
+            conn = sqlite3.connect(
+                f"file:{pathname2url(os.path.abspath(self.db_name))}?mode=ro",
+                uri=True,
+                timeout=profile['busy_timeout'] / 1000,
+                check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_name,
+                timeout=profile['busy_timeout'] / 1000,
+                check_same_thread=False
+            )
+            conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+        conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+        conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+        conn.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+        return conn
+    
+    def acquire(self):
+        """Check out an idle connection, opening a new one while under max_size"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        self._count('checkouts')
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_create = self._created < self.max_size
+            if can_create:
+                self._created += 1
+                self._stats['connections_created'] += 1
+        
+        if can_create:
+            try:
+                return self.open_connection()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        # Pool is at capacity - wait for another thread to return a connection
+        self._count('waits')
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            self._count('exhausted')
+            raise sqlite3.OperationalError(
+                f"Connection pool exhausted ({self.max_size} connections in use)"
+            )
+    
+    def release(self, conn):
+        """Return a connection to the pool, or close it if the pool has been closed"""
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success, roll back on error"""
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            self._count('rollbacks')
+            raise
+        finally:
+            self.release(conn)
+    
+    def stats(self):
+        """Snapshot of pool counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['open_connections'] = self._created
+        snapshot['idle_connections'] = self._idle.qsize()
+        snapshot['max_size'] = self.max_size
+        snapshot['profile'] = self.profile_name
+        snapshot['read_only'] = self.read_only
+        return snapshot
+    
+    def close_all(self):
+        """Close every idle connection and refuse new checkouts; checked-out ones are closed on release"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_name, profile=None, read_only=False):
+    """Get the process-wide connection pool for a database file (first caller picks the profile)"""
+    key = (os.path.abspath(db_name), read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_name, profile=profile, read_only=read_only)
+            _pools[key] = pool
+        return pool
+
+
+# Column order the pages index into; renters has extra columns added by migrations
+RENTER_COLUMNS = "renter_id, name, phone, email, join_date, is_active"
+
+# Full-table exports streamed by iter_export (see data_export.py). Columns
+# are (name, kind) with kind one of int, real, text, bool; rows come in
+# primary key order so a reader never needs the whole table in memory.
+EXPORT_CHUNK_SIZE = 1000
+EXPORTS = {
+    'payments': (
+        [('payment_id', 'int'), ('renter_id', 'int'), ('renter_name', 'text'), ('phone', 'text'),
+         ('month_year', 'text'), ('amount', 'real'), ('payment_date', 'text'), ('payment_method', 'text')],
+        '''
+            SELECT p.payment_id, p.renter_id, r.name, r.phone,
+                   p.month_year, p.amount, p.payment_date, p.payment_method
+            FROM payments p
+            JOIN renters r ON p.renter_id = r.renter_id
+            ORDER BY p.payment_id
+        '''
+    ),
+    'renters': (
+        [('renter_id', 'int'), ('unique_id', 'text'), ('name', 'text'), ('phone', 'text'),
+         ('email', 'text'), ('join_date', 'text'), ('is_active', 'bool'),
+         ('room_number', 'text'), ('bed_number', 'int')],
+        '''
+            SELECT r.renter_id, r.unique_id, r.name, r.phone, r.email, r.join_date, r.is_active,
+                   rm.room_number, b.bed_number
+            FROM renters r
+            LEFT JOIN beds b ON b.renter_id = r.renter_id AND b.is_occupied = TRUE
+            LEFT JOIN rooms rm ON b.room_id = rm.room_id
+            ORDER BY r.renter_id
+        '''
+    ),
+    'complaints': (
+        [('complaint_id', 'int'), ('renter_id', 'int'), ('renter_name', 'text'), ('title', 'text'),
+         ('category', 'text'), ('priority', 'text'), ('status', 'text'), ('created_date', 'text'),
+         ('resolved_date', 'text'), ('description', 'text'), ('admin_response', 'text')],
+        '''
+            SELECT c.complaint_id, c.renter_id, r.name, c.title, c.category, c.priority, c.status,
+                   c.created_date, c.resolved_date, c.description, c.admin_response
+            FROM complaints c
+            JOIN renters r ON c.renter_id = r.renter_id
+            ORDER BY c.complaint_id
+        '''
+    ),
+}
+
+# Triage order of the complaints list. The SQL matches the expressions of
+# idx_complaints_triage so filters and ORDER BY can use that index. Any
+# other status or priority ranks last rather than NULL, which the keyset
+# comparison would drop from every page.
+COMPLAINT_STATUS_RANK = {'Open': 1, 'In Progress': 2, 'Resolved': 3}
+COMPLAINT_PRIORITY_RANK = {'High': 1, 'Medium': 2, 'Low': 3}
+COMPLAINT_UNKNOWN_RANK = 4
+STATUS_RANK_SQL = "CASE c.status WHEN 'Open' THEN 1 WHEN 'In Progress' THEN 2 WHEN 'Resolved' THEN 3 ELSE 4 END"
+PRIORITY_RANK_SQL = "CASE c.priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 ELSE 4 END"
+
+# bm25 weights for complaints_fts columns: title, description, admin_response
+COMPLAINT_SEARCH_RANK_SQL = "bm25(complaints_fts, 10.0, 5.0, 1.0)"
+FTS_MIN_PREFIX = 3
+
+
+def fts_match_query(text):
+    """Turn free text into an FTS5 query matching every word; None if it has no words
+    
+    Each word is quoted, so input like AND, NOT or a stray quote is searched
+    for literally instead of being parsed as FTS5 syntax. The last word is
+    also matched as a prefix once it has a few letters; a shorter prefix
+    would expand to most of the index and rank nearly every complaint.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    query = " ".join(f'"{word}"' for word in words)
+    if len(words[-1]) >= FTS_MIN_PREFIX:
+        query += "*"
+    return query
+
+
+def keyset_after(keys, values):
+    """Build a WHERE term selecting rows strictly after values in the order given by keys
+    
+    keys is a list of (sql_expression, descending) pairs and values holds the
+    last row's value for each. Returns (sql, params).
+    """
+    sql = None
+    params = []
+    for (expr, descending), value in reversed(list(zip(keys, values))):
+        op = '<' if descending else '>'
+        if sql is None:
+            sql = f"{expr} {op} ?"
+            params = [value]
+        else:
+            sql = f"({expr} {op} ? OR ({expr} = ? AND {sql}))"
+            params = [value, value] + params
+    
+    # A plain range on the leading key lets SQLite seek instead of scanning from the start
+    expr, descending = keys[0]
+    return f"{expr} {'<=' if descending else '>='} ? AND {sql}", [values[0]] + params
+
+
+_bootstrapped = set()
+_bootstrap_lock = threading.Lock()
+
+_databases = {}
+
+
+def get_database(db_name="pg_simple.db"):
+    """Get the shared SimplePGDatabase handle for a database file"""
+    key = os.path.abspath(db_name)
+    with _pools_lock:
+        db = _databases.get(key)
+    if db is None:
+        db = SimplePGDatabase(db_name)
+        with _pools_lock:
+            db = _databases.setdefault(key, db)
+    return db
+
 
 class SimplePGDatabase:
     """Simplified PG Management Database - Only Essential Tables"""
     
-    def __init__(self, db_name="pg_simple.db"):
+    def __init__(self, db_name="pg_simple.db", profile=None, read_only=False):
         self.db_name = db_name
-        self.init_database()
+        self.db_key = os.path.abspath(db_name)
+        self.pool = get_pool(db_name, profile, read_only)
+        # A read-only handle expects a writer to have migrated the file already
+        if not read_only:
+            self.ensure_schema()
     
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_name)
+        """Get a standalone database connection (caller must close it)"""
+        return self.pool.open_connection()
     
-    def init_database(self):
-        """Initialize database with only essential tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def connection(self):
+        """Pooled connection context manager - commits on success, rolls back on error"""
+        return self.pool.connection()
+    
+    def pool_stats(self):
+        """Get connection pool counters (checkouts, waits, exhaustion)"""
+        return self.pool.stats()
+    
+    def get_change_sequences(self):
+        """Get {table: seq} from table_changes; a seq moves on every write to its table"""
+        with self.connection() as conn:
+            return dict(conn.execute("SELECT table_name, seq FROM table_changes").fetchall())
+    
+    def cache_stats(self):
+        """Get query cache counters (hits, misses, evictions, invalidations)"""
+        return query_cache.stats()
+    
+    def ensure_schema(self):
+        """Run init_database once per process and database file
+
+        Only the schema steps run here; backfills continue on a background
+        thread, so opening the database never waits for them.
+        """
+        key = self.db_key
+        if key in _bootstrapped:
+            return
         
+        with _bootstrap_lock:
+            if key in _bootstrapped:
+                return
+            
+            self.init_database()
+            _bootstrapped.add(key)
+    
+    def init_database(self):
+        """Bring the database up to the latest schema version and start pending backfills"""
+        applied = migrations.apply_schema(self)
+        migrations.start_backfills(self)
+        return applied
+    
+    def create_tables(self, cursor):
+        """Create the essential tables (schema version 1)"""
         # 1. ADMINS TABLE - For admin users
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS admins (
@@ -115,32 +463,32 @@ class SimplePGDatabase:
                 INSERT INTO admins (username, password, name)
                 VALUES ('admin', 'admin123', 'Administrator')
             ''')
-        
-        conn.commit()
-        conn.close()
     
     # ADMIN METHODS
     def authenticate_admin(self, username, password):
         """Authenticate admin user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM admins WHERE username = ? AND password = ?", (username, password))
-        admin = cursor.fetchone()
-        conn.close()
-        return admin
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM admins WHERE username = ? AND password = ?", (username, password))
+            return cursor.fetchone()
     
     # RENTER METHODS
+    @invalidates('renters')
     def add_renter(self, name, phone, email, join_date):
         """Add a new renter"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO renters (name, phone, email, join_date)
-                VALUES (?, ?, ?, ?)
-            ''', (name, phone, email, join_date))
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO renters (name, phone, email, join_date)
+                    VALUES (?, ?, ?, ?)
+                ''', (name, phone, email, join_date))
+                
+                renter_id = cursor.lastrowid
+                cursor.execute(
+                    "UPDATE renters SET unique_id = ? WHERE renter_id = ?",
+                    (make_renter_unique_id(renter_id, join_date), renter_id)
+                )
             return True, "Renter added successfully"
         except sqlite3.IntegrityError:
             return False, "Phone number already exists"
@@ -149,377 +497,988 @@ class SimplePGDatabase:
     
     def authenticate_renter(self, phone):
         """Authenticate renter user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM renters WHERE phone = ? AND is_active = TRUE", (phone,))
-        renter = cursor.fetchone()
-        conn.close()
-        return renter
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {RENTER_COLUMNS} FROM renters WHERE phone = ? AND is_active = TRUE", (phone,))
+            return cursor.fetchone()
     
+    @cached_query('renters')
     def get_all_renters(self):
         """Get all renters"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM renters ORDER BY name")
-        renters = cursor.fetchall()
-        conn.close()
-        return renters
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {RENTER_COLUMNS} FROM renters ORDER BY name")
+            return cursor.fetchall()
     
+    @cached_query('renters', 'beds', 'rooms')
     def get_renter_details(self, renter_id):
         """Get renter details with room info"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT r.*, rm.room_number, rm.room_type, rm.monthly_rent, b.bed_number
-            FROM renters r
-            LEFT JOIN beds b ON r.renter_id = b.renter_id AND b.is_occupied = TRUE
-            LEFT JOIN rooms rm ON b.room_id = rm.room_id
-            WHERE r.renter_id = ?
-        ''', (renter_id,))
-        details = cursor.fetchone()
-        conn.close()
-        return details
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT r.renter_id, r.name, r.phone, r.email, r.join_date, r.is_active,
+                       rm.room_number, rm.room_type, rm.monthly_rent, b.bed_number
+                FROM renters r
+                LEFT JOIN beds b ON r.renter_id = b.renter_id AND b.is_occupied = TRUE
+                LEFT JOIN rooms rm ON b.room_id = rm.room_id
+                WHERE r.renter_id = ?
+            ''', (renter_id,))
+            return cursor.fetchone()
+    
+    def get_renters_by_contact(self, phones, unique_ids):
+        """Get (renter_id, name, phone, unique_id) for renters matching any of the phones or unique IDs"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT renter_id, name, phone, unique_id
+                FROM renters
+                WHERE phone IN (SELECT value FROM json_each(?))
+                   OR unique_id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(list(phones)), json.dumps(list(unique_ids))))
+            return cursor.fetchall()
+    
+    @cached_query('renters', 'beds', 'rooms')
+    def get_active_renters_with_rooms(self):
+        """Get active renters that have a bed, with their room and rent, in one query"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT r.renter_id, r.name, r.phone, rm.room_number, rm.room_type,
+                       rm.monthly_rent, b.bed_number
+                FROM beds b
+                JOIN renters r ON b.renter_id = r.renter_id
+                JOIN rooms rm ON b.room_id = rm.room_id
+                WHERE b.is_occupied = TRUE AND r.is_active = TRUE
+                ORDER BY r.name
+            ''')
+            return cursor.fetchall()
     
     # ROOM METHODS
+    @invalidates('rooms', 'beds')
     def add_room(self, room_number, room_type, sharing_type, monthly_rent):
         """Add a new room with beds"""
+        return self.add_rooms([(room_number, room_type, sharing_type, monthly_rent)])[0]
+    
+    @invalidates('rooms', 'beds')
+    def add_rooms(self, rooms):
+        """Add many rooms with their beds in one transaction
+        
+        rooms is a list of (room_number, room_type, sharing_type, monthly_rent).
+        Returns (success, message) per room; existing room numbers are skipped.
+        """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO rooms (room_number, room_type, sharing_type, monthly_rent)
-                VALUES (?, ?, ?, ?)
-            ''', (room_number, room_type, sharing_type, monthly_rent))
-            
-            room_id = cursor.lastrowid
-            
-            # Create beds
-            for bed_num in range(1, sharing_type + 1):
-                cursor.execute('''
-                    INSERT INTO beds (room_id, bed_number)
-                    VALUES (?, ?)
-                ''', (room_id, bed_num))
-            
-            conn.commit()
-            conn.close()
-            return True, f"Room {room_number} added with {sharing_type} beds"
-        except sqlite3.IntegrityError:
-            return False, f"Room {room_number} already exists"
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                
+                numbers = json.dumps([str(room[0]) for room in rooms])
+                cursor.execute(
+                    "SELECT room_number FROM rooms WHERE room_number IN (SELECT value FROM json_each(?))",
+                    (numbers,)
+                )
+                taken = {row[0] for row in cursor.fetchall()}
+                
+                results = []
+                new_rooms = []
+                for room_number, room_type, sharing_type, monthly_rent in rooms:
+                    room_number = str(room_number)
+                    if room_number in taken:
+                        results.append((False, f"Room {room_number} already exists"))
+                        continue
+                    taken.add(room_number)
+                    new_rooms.append((room_number, room_type, int(sharing_type), monthly_rent))
+                    results.append((True, f"Room {room_number} added with {int(sharing_type)} beds"))
+                
+                cursor.executemany('''
+                    INSERT INTO rooms (room_number, room_type, sharing_type, monthly_rent)
+                    VALUES (?, ?, ?, ?)
+                ''', new_rooms)
+                
+                # Create beds
+                cursor.execute(
+                    "SELECT room_id, sharing_type FROM rooms WHERE room_number IN (SELECT value FROM json_each(?))",
+                    (json.dumps([room[0] for room in new_rooms]),)
+                )
+                cursor.executemany(
+                    "INSERT INTO beds (room_id, bed_number) VALUES (?, ?)",
+                    [
+                        (room_id, bed_num)
+                        for room_id, sharing_type in cursor.fetchall()
+                        for bed_num in range(1, sharing_type + 1)
+                    ]
+                )
+            return results
         except Exception as e:
-            return False, f"Error: {str(e)}"
+            return [(False, f"Error: {str(e)}")] * len(rooms)
     
+    @cached_query('rooms')
     def get_all_rooms(self):
         """Get all rooms"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM rooms ORDER BY room_number")
-        rooms = cursor.fetchall()
-        conn.close()
-        return rooms
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM rooms ORDER BY room_number")
+            return cursor.fetchall()
     
+    @cached_query('beds')
     def get_room_beds(self, room_id):
         """Get beds for a room"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT bed_id, bed_number, is_occupied, renter_id
-            FROM beds
-            WHERE room_id = ?
-            ORDER BY bed_number
-        ''', (room_id,))
-        beds = cursor.fetchall()
-        conn.close()
-        return beds
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT bed_id, bed_number, is_occupied, renter_id
+                FROM beds
+                WHERE room_id = ?
+                ORDER BY bed_number
+            ''', (room_id,))
+            return cursor.fetchall()
+    
+    @cached_query('rooms', 'beds')
+    def get_occupancy_report(self):
+        """Get bed occupancy per room (room, type, total, occupied, empty) in one grouped query"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT rm.room_number, rm.room_type,
+                       COUNT(b.bed_id) AS total_beds,
+                       COALESCE(SUM(b.is_occupied = TRUE), 0) AS occupied
+                FROM rooms rm
+                LEFT JOIN beds b ON b.room_id = rm.room_id
+                GROUP BY rm.room_number
+                ORDER BY rm.room_number
+            ''')
+            return [
+                (room_number, room_type, total, occupied, total - occupied)
+                for room_number, room_type, total, occupied in cursor.fetchall()
+            ]
+    
+    @cached_query('renters', 'beds', 'rooms')
+    def get_move_ins(self, month_from=None):
+        """Get (join month, room_type, renters) for current occupants, by the month they joined"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT strftime('%Y-%m', r.join_date) AS join_month, rm.room_type, COUNT(*)
+                FROM beds b
+                JOIN renters r ON r.renter_id = b.renter_id
+                JOIN rooms rm ON rm.room_id = b.room_id
+                WHERE b.is_occupied = TRUE AND strftime('%Y-%m', r.join_date) >= ?
+                GROUP BY join_month, rm.room_type
+                ORDER BY join_month, rm.room_type
+            ''', (month_from or '',))
+            return cursor.fetchall()
     
     # BED ALLOCATION
-    def allocate_bed(self, renter_id, room_id, bed_number):
-        """Allocate a bed to a renter"""
-        try:
-            conn = self.get_connection()
+    @cached_query('rooms', 'beds')
+    def get_free_beds(self):
+        """Get every empty bed (room_id, room_number, room_type, sharing_type, monthly_rent, bed_number)"""
+        with self.connection() as conn:
             cursor = conn.cursor()
-            
-            # Check if bed is available
             cursor.execute('''
-                SELECT is_occupied FROM beds
-                WHERE room_id = ? AND bed_number = ?
-            ''', (room_id, bed_number))
-            
-            bed = cursor.fetchone()
-            if not bed or bed[0]:
-                return False, "Bed is not available"
-            
-            # Check if renter already has a bed
-            cursor.execute("SELECT COUNT(*) FROM beds WHERE renter_id = ?", (renter_id,))
-            if cursor.fetchone()[0] > 0:
-                return False, "Renter already has a bed"
-            
-            # Allocate bed
+                SELECT r.room_id, r.room_number, r.room_type, r.sharing_type, r.monthly_rent, b.bed_number
+                FROM rooms r
+                JOIN beds b ON b.room_id = r.room_id
+                WHERE COALESCE(b.is_occupied, FALSE) = FALSE
+                ORDER BY r.room_number, b.bed_number
+            ''')
+            return cursor.fetchall()
+    
+    @cached_query('renters', 'beds')
+    def get_unallocated_renters(self):
+        """Get active renters without a bed (renter_id, name, phone, join_date), earliest joiners first"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT r.renter_id, r.name, r.phone, r.join_date
+                FROM renters r
+                WHERE r.is_active = TRUE
+                  AND NOT EXISTS (
+                      SELECT 1 FROM beds b WHERE b.renter_id = r.renter_id AND b.is_occupied = TRUE
+                  )
+                ORDER BY r.join_date, r.renter_id
+            ''')
+            return cursor.fetchall()
+    
+    def _claim_bed(self, cursor, renter_id, room_id, bed_number):
+        """Claim an empty bed for a renter without one; returns (success, message)"""
+        # One guarded write: only an empty bed, only a renter without a bed
+        try:
             cursor.execute('''
                 UPDATE beds
                 SET is_occupied = TRUE, renter_id = ?
                 WHERE room_id = ? AND bed_number = ?
-            ''', (renter_id, room_id, bed_number))
-            
-            conn.commit()
-            conn.close()
+                  AND COALESCE(is_occupied, FALSE) = FALSE
+                  AND NOT EXISTS (
+                      SELECT 1 FROM beds WHERE renter_id = ? AND is_occupied = TRUE
+                  )
+            ''', (renter_id, room_id, bed_number, renter_id))
+        except sqlite3.IntegrityError:
+            # idx_beds_renter_occupied: the renter got a bed through another path
+            return False, "Renter already has a bed"
+        if cursor.rowcount == 1:
             return True, "Bed allocated successfully"
+        
+        cursor.execute('''
+            SELECT COALESCE(is_occupied, FALSE) FROM beds
+            WHERE room_id = ? AND bed_number = ?
+        ''', (room_id, bed_number))
+        bed = cursor.fetchone()
+        if not bed or bed[0]:
+            return False, "Bed is not available"
+        return False, "Renter already has a bed"
+    
+    @invalidates('beds')
+    def allocate_bed(self, renter_id, room_id, bed_number):
+        """Allocate a bed to a renter"""
+        try:
+            with self.connection() as conn:
+                # Take the write lock up front so the guard and the write see the same state
+                conn.execute("BEGIN IMMEDIATE")
+                return self._claim_bed(conn.cursor(), renter_id, room_id, bed_number)
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    # Batch operations apply a whole list in one transaction. A failed item
+    # does not undo the others; each gets its own (success, message).
+    @invalidates('beds')
+    def allocate_beds(self, allocations, atomic=False):
+        """Allocate beds for a list of (renter_id, room_id, bed_number)
+        
+        With atomic=True the batch is all or nothing: if any bed cannot be
+        claimed, every allocation is rolled back.
+        """
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                results = [
+                    self._claim_bed(cursor, renter_id, room_id, bed_number)
+                    for renter_id, room_id, bed_number in allocations
+                ]
+                if atomic and not all(success for success, _ in results):
+                    conn.rollback()
+                    results = [
+                        (False, message if not success else "Rolled back with the rest of the batch")
+                        for success, message in results
+                    ]
+                return results
+        except Exception as e:
+            return [(False, f"Error: {str(e)}")] * len(allocations)
+    
+    @invalidates('beds')
+    def transfer_beds(self, transfers):
+        """Move renters to new beds for a list of (renter_id, room_id, bed_number)"""
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                results = []
+                for renter_id, room_id, bed_number in transfers:
+                    cursor.execute("SAVEPOINT transfer")
+                    cursor.execute('''
+                        UPDATE beds SET is_occupied = FALSE, renter_id = NULL
+                        WHERE renter_id = ? AND is_occupied = TRUE
+                    ''', (renter_id,))
+                    if cursor.rowcount == 0:
+                        success, message = False, "Renter has no bed"
+                    else:
+                        success, message = self._claim_bed(cursor, renter_id, room_id, bed_number)
+                    
+                    if success:
+                        cursor.execute("RELEASE transfer")
+                        results.append((True, "Bed transferred successfully"))
+                    else:
+                        # Give the renter their old bed back
+                        cursor.execute("ROLLBACK TO transfer")
+                        cursor.execute("RELEASE transfer")
+                        results.append((False, message))
+                return results
+        except Exception as e:
+            return [(False, f"Error: {str(e)}")] * len(transfers)
+    
+    @invalidates('beds')
+    def vacate_beds(self, renter_ids):
+        """Free the beds held by a list of renters"""
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                results = []
+                for renter_id in renter_ids:
+                    cursor.execute('''
+                        UPDATE beds SET is_occupied = FALSE, renter_id = NULL
+                        WHERE renter_id = ? AND is_occupied = TRUE
+                    ''', (renter_id,))
+                    if cursor.rowcount:
+                        results.append((True, "Bed vacated successfully"))
+                    else:
+                        results.append((False, "Renter has no bed"))
+                return results
+        except Exception as e:
+            return [(False, f"Error: {str(e)}")] * len(renter_ids)
+    
     # PAYMENT METHODS
+    @invalidates('payments')
     def add_payment(self, renter_id, month_year, amount, payment_date, payment_method):
         """Add a payment record"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO payments (renter_id, month_year, amount, payment_date, payment_method)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (renter_id, month_year, amount, payment_date, payment_method))
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO payments (renter_id, month_year, amount, payment_date, payment_method)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (renter_id, month_year, amount, payment_date, payment_method))
             return True, "Payment recorded successfully"
         except sqlite3.IntegrityError:
             return False, f"Payment for {month_year} already exists"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    @invalidates('payments')
+    def add_payments(self, payments, overwrite=False):
+        """Record many payments in one transaction
+        
+        payments is a list of (renter_id, month_year, amount, payment_date, payment_method).
+        Returns (status, message) per payment, status being 'added', 'updated',
+        'duplicate' (same amount already recorded) or 'conflict' (a different
+        amount is recorded for that month; replaced only when overwrite is True).
+        """
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                
+                keys = json.dumps([[renter_id, month_year] for renter_id, month_year, _, _, _ in payments])
+                cursor.execute('''
+                    SELECT p.renter_id, p.month_year, p.amount
+                    FROM json_each(?) k
+                    JOIN payments p
+                      ON p.renter_id = json_extract(k.value, '$[0]')
+                     AND p.month_year = json_extract(k.value, '$[1]')
+                ''', (keys,))
+                recorded = {(renter_id, month_year): amount for renter_id, month_year, amount in cursor.fetchall()}
+                
+                results = []
+                inserts = []
+                updates = []
+                for renter_id, month_year, amount, payment_date, payment_method in payments:
+                    key = (renter_id, month_year)
+                    if key not in recorded:
+                        inserts.append((renter_id, month_year, amount, payment_date, payment_method))
+                        results.append(('added', f"Payment for {month_year} recorded"))
+                    elif recorded[key] == amount:
+                        results.append(('duplicate', f"Payment for {month_year} already recorded"))
+                        continue
+                    elif overwrite:
+                        updates.append((amount, payment_date, payment_method, renter_id, month_year))
+                        results.append(('updated', f"Payment for {month_year} changed from "
+                                                   f"₹{recorded[key]:,.0f} to ₹{amount:,.0f}"))
+                    else:
+                        results.append(('conflict', f"Payment for {month_year} already recorded "
+                                                    f"as ₹{recorded[key]:,.0f}, statement says ₹{amount:,.0f}"))
+                        continue
+                    recorded[key] = amount
+                
+                cursor.executemany('''
+                    INSERT INTO payments (renter_id, month_year, amount, payment_date, payment_method)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', inserts)
+                cursor.executemany('''
+                    UPDATE payments SET amount = ?, payment_date = ?, payment_method = ?
+                    WHERE renter_id = ? AND month_year = ?
+                ''', updates)
+            return results
+        except Exception as e:
+            return [('error', f"Error: {str(e)}")] * len(payments)
+    
+    @cached_query('payments')
     def get_renter_payments(self, renter_id):
         """Get payment history for a renter"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT payment_id, month_year, amount, payment_date, payment_method
-            FROM payments
-            WHERE renter_id = ?
-            ORDER BY payment_date DESC
-        ''', (renter_id,))
-        payments = cursor.fetchall()
-        conn.close()
-        return payments
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT payment_id, month_year, amount, payment_date, payment_method
+                FROM payments
+                WHERE renter_id = ?
+                ORDER BY payment_date DESC
+            ''', (renter_id,))
+            return cursor.fetchall()
     
     def get_all_payments(self):
         """Get all payments"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT p.payment_id, r.name, p.month_year, p.amount, p.payment_date, p.payment_method
-            FROM payments p
-            JOIN renters r ON p.renter_id = r.renter_id
-            ORDER BY p.payment_date DESC
-        ''')
-        payments = cursor.fetchall()
-        conn.close()
-        return payments
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT p.payment_id, r.name, p.month_year, p.amount, p.payment_date, p.payment_method
+                FROM payments p
+                JOIN renters r ON p.renter_id = r.renter_id
+                ORDER BY p.payment_date DESC
+            ''')
+            return cursor.fetchall()
     
-    # DASHBOARD STATS
-    def get_dashboard_stats(self):
-        """Get dashboard statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM rooms")
-        total_rooms = cursor.fetchone()[0]
+    def _payment_filters(self, month_from=None, month_to=None, payment_method=None, renter_id=None):
+        """Build the WHERE terms and parameters shared by the payment page and summary"""
+        terms = []
+        params = []
+        if month_from:
+            terms.append("p.month_year >= ?")
+            params.append(month_from)
+        if month_to:
+            terms.append("p.month_year <= ?")
+            params.append(month_to)
+        if payment_method:
+            terms.append("p.payment_method = ?")
+            params.append(payment_method)
+        if renter_id:
+            terms.append("p.renter_id = ?")
+            params.append(renter_id)
+        return terms, params
+    
+    @cached_query('payments', 'renters')
+    def get_payments_page(self, page_size=50, after=None, month_from=None, month_to=None,
+                          payment_method=None, renter_id=None):
+        """Get one page of payments, newest first, using a keyset cursor
         
-        cursor.execute("SELECT COUNT(*) FROM beds")
-        total_beds = cursor.fetchone()[0]
+        after is the (payment_date, payment_id) of the last row of the previous
+        page, or None for the first page. Returns (rows, next_cursor); rows have
+        the same columns as get_all_payments and next_cursor is None on the last page.
+        """
+        terms, params = self._payment_filters(month_from, month_to, payment_method, renter_id)
+        if after:
+            terms.append("(p.payment_date, p.payment_id) < (?, ?)")
+            params.extend([str(after[0]), after[1]])
+        where = f"WHERE {' AND '.join(terms)}" if terms else ""
         
-        cursor.execute("SELECT COUNT(*) FROM beds WHERE is_occupied = TRUE")
-        occupied_beds = cursor.fetchone()[0]
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT p.payment_id, r.name, p.month_year, p.amount, p.payment_date, p.payment_method
+                FROM payments p
+                JOIN renters r ON p.renter_id = r.renter_id
+                {where}
+                ORDER BY p.payment_date DESC, p.payment_id DESC
+                LIMIT ?
+            ''', params + [page_size + 1])
+            rows = cursor.fetchall()
         
-        cursor.execute("SELECT COUNT(*) FROM renters WHERE is_active = TRUE")
-        active_renters = cursor.fetchone()[0]
+        # One extra row tells us whether another page exists
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            return rows, (last[4], last[0])
+        return rows, None
+    
+    @cached_query('payments')
+    def get_payments_summary(self, month_from=None, month_to=None, payment_method=None, renter_id=None):
+        """Get the count and total amount of payments matching the page filters"""
+        terms, params = self._payment_filters(month_from, month_to, payment_method, renter_id)
+        where = f"WHERE {' AND '.join(terms)}" if terms else ""
         
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(p.amount), 0) FROM payments p {where}", params)
+            count, total = cursor.fetchone()
+        return {'count': count, 'total': total}
+    
+    # ARREARS
+    @cached_query('renters', 'beds', 'rooms', 'payments')
+    def get_arrears(self, as_of_month=None):
+        """Get renters behind on rent as of a YYYY-MM month (default this month), largest arrears first
         
+        Rows are (renter_id, name, phone, room_number, monthly_rent, join_date, months_due,
+        months_paid, amount_due, amount_paid, arrears, last_paid_month). Every month from the
+        join month through as_of_month is due at the current room's rent.
+        """
+        as_of_month = as_of_month or date.today().strftime("%Y-%m")
+        as_of_index = int(as_of_month[:4]) * 12 + int(as_of_month[5:7])
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                WITH due AS (
+                    SELECT r.renter_id, r.name, r.phone, rm.room_number, rm.monthly_rent, r.join_date,
+                           strftime('%Y-%m', r.join_date) AS first_month,
+                           ? - (CAST(strftime('%Y', r.join_date) AS INTEGER) * 12
+                                + CAST(strftime('%m', r.join_date) AS INTEGER)) + 1 AS months_due
+                    FROM renters r
+                    JOIN beds b ON b.renter_id = r.renter_id AND b.is_occupied = TRUE
+                    JOIN rooms rm ON rm.room_id = b.room_id
+                    WHERE r.is_active = TRUE
+                )
+                SELECT d.renter_id, d.name, d.phone, d.room_number, d.monthly_rent, d.join_date,
+                       d.months_due, COUNT(p.payment_id) AS months_paid,
+                       d.months_due * d.monthly_rent AS amount_due,
+                       COALESCE(SUM(p.amount), 0) AS amount_paid,
+                       d.months_due * d.monthly_rent - COALESCE(SUM(p.amount), 0) AS arrears,
+                       MAX(p.month_year) AS last_paid_month
+                FROM due d
+                LEFT JOIN payments p
+                  ON p.renter_id = d.renter_id AND p.month_year BETWEEN d.first_month AND ?
+                WHERE d.months_due > 0
+                GROUP BY d.renter_id
+                HAVING arrears > 0
+                ORDER BY arrears DESC, d.renter_id
+            ''', (as_of_index, as_of_month))
+            return cursor.fetchall()
+    
+    # STATS COUNTERS (maintained by triggers, see migrations.STATS_TRIGGERS)
+    @cached_query('rooms', 'beds', 'renters', 'complaints', 'notifications', 'stats')
+    def get_stats_counters(self):
+        """Get every materialized stats counter as a dict"""
+        with self.connection() as conn:
+            return dict(conn.execute("SELECT name, value FROM stats").fetchall())
+    
+    @invalidates('stats')
+    def check_stats(self, rebuild=False):
+        """Compare stats counters with fresh counts; returns {name: (stored, actual)} for mismatches"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            stored = dict(cursor.execute("SELECT name, value FROM stats").fetchall())
+            actual = migrations.compute_stats(cursor)
+            
+            mismatches = {}
+            for name in set(stored) | set(actual):
+                if stored.get(name, 0) != actual.get(name, 0):
+                    mismatches[name] = (stored.get(name, 0), actual.get(name, 0))
+            
+            if rebuild and mismatches:
+                migrations.rebuild_stats(cursor)
+                cursor.execute("UPDATE table_changes SET seq = seq + 1 WHERE table_name = 'stats'")
+        return mismatches
+    
+    # REVENUE ROLLUP (maintained by triggers, see migrations.REVENUE_TRIGGERS)
+    @cached_query('payments', 'revenue')
+    def get_revenue_rollup(self, month_from=None, month_to=None):
+        """Get revenue per (month_year, payment_method, room_type, payment_count, amount), oldest month first"""
+        terms = ["payment_count > 0"]
+        params = []
+        if month_from:
+            terms.append("month_year >= ?")
+            params.append(month_from)
+        if month_to:
+            terms.append("month_year <= ?")
+            params.append(month_to)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT month_year, payment_method, room_type, payment_count, amount
+                FROM revenue_rollup
+                WHERE {" AND ".join(terms)}
+                ORDER BY month_year, payment_method, room_type
+            ''', params)
+            return cursor.fetchall()
+    
+    @invalidates('revenue')
+    def check_revenue_rollup(self, rebuild=False):
+        """Compare the revenue rollup with a fresh aggregate; returns {key: (stored, actual)} for mismatches"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            cursor.execute("SELECT month_year, payment_method, room_type, payment_count, amount FROM revenue_rollup")
+            stored = {
+                (month, method, room_type): (count, amount)
+                for month, method, room_type, count, amount in cursor.fetchall()
+                if count
+            }
+            actual = migrations.compute_revenue_rollup(cursor)
+            
+            mismatches = {}
+            for key in set(stored) | set(actual):
+                stored_count, stored_amount = stored.get(key, (0, 0))
+                actual_count, actual_amount = actual.get(key, (0, 0))
+                # Amounts are summed in a different order, so compare to the paisa
+                if stored_count != actual_count or round(stored_amount - actual_amount, 2):
+                    mismatches[key] = (stored.get(key, (0, 0)), actual.get(key, (0, 0)))
+            
+            if rebuild and mismatches:
+                migrations.rebuild_revenue_rollup(cursor)
+                cursor.execute("UPDATE table_changes SET seq = seq + 1 WHERE table_name = 'revenue'")
+        return mismatches
+    
+    @invalidates('complaints')
+    def check_complaint_search(self, rebuild=False):
+        """Compare the complaint search index with the complaints; returns {problem: row count} for mismatches"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) FROM complaints c
+                LEFT JOIN complaints_fts f ON f.rowid = c.complaint_id
+                WHERE f.rowid IS NULL OR f.title IS NOT c.title
+                   OR f.description IS NOT c.description OR f.admin_response IS NOT c.admin_response
+            ''')
+            stale = cursor.fetchone()[0]
+            cursor.execute('''
+                SELECT COUNT(*) FROM complaints_fts f
+                WHERE NOT EXISTS (SELECT 1 FROM complaints c WHERE c.complaint_id = f.rowid)
+            ''')
+            orphaned = cursor.fetchone()[0]
+            
+            mismatches = {name: count for name, count in (('missing or stale', stale), ('orphaned', orphaned)) if count}
+            if rebuild and mismatches:
+                migrations.rebuild_complaint_search(cursor)
+                # Search results are cached on the complaints table
+                cursor.execute("UPDATE table_changes SET seq = seq + 1 WHERE table_name = 'complaints'")
+        return mismatches
+    
+    def _dashboard_stats(self, counters):
+        total_beds = counters.get('total_beds', 0)
+        occupied_beds = counters.get('occupied_beds', 0)
         return {
-            'total_rooms': total_rooms,
+            'total_rooms': counters.get('total_rooms', 0),
             'total_beds': total_beds,
             'occupied_beds': occupied_beds,
             'empty_beds': total_beds - occupied_beds,
-            'active_renters': active_renters
+            'active_renters': counters.get('active_renters', 0)
         }
+    
+    # DASHBOARD STATS
+    def get_dashboard_stats(self):
+        """Get dashboard statistics"""
+        return self._dashboard_stats(self.get_stats_counters())
+    
+    @cached_query('rooms', 'beds', 'renters', 'complaints', 'notifications', 'stats')
+    def get_dashboard_snapshot(self, notification_limit=5):
+        """Get everything the admin dashboard shows in a single query
+        
+        Returns the get_dashboard_stats keys plus 'unread_notifications'
+        and 'recent_notifications' (same rows as get_admin_notifications).
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    (SELECT json_group_object(name, value) FROM stats),
+                    (SELECT json_group_array(json_array(
+                                notification_id, notification_type, message,
+                                created_date, is_read, renter_name))
+                     FROM (
+                        SELECT n.notification_id, n.notification_type, n.message, n.created_date,
+                               n.is_read, r.name as renter_name
+                        FROM notifications n
+                        LEFT JOIN renters r ON n.renter_id = r.renter_id
+                        ORDER BY n.is_read ASC, n.created_date DESC
+                        LIMIT ?
+                     ))
+            ''', (notification_limit,))
+            counters, recent = cursor.fetchone()
+        
+        # json_group_array does not promise to keep the subquery order
+        notifications = [tuple(n) for n in json.loads(recent)]
+        notifications.sort(key=lambda n: n[3], reverse=True)
+        notifications.sort(key=lambda n: n[4])
+        
+        counters = json.loads(counters)
+        snapshot = self._dashboard_stats(counters)
+        snapshot['unread_notifications'] = counters.get('unread_notifications', 0)
+        snapshot['recent_notifications'] = notifications
+        return snapshot
 # COMPLAINT METHODS
+    @invalidates('complaints')
     def add_complaint(self, renter_id, title, description, category, priority='Medium'):
         """Add a new complaint"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            created_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute('''
-                INSERT INTO complaints (renter_id, title, description, category, priority, status, created_date)
-                VALUES (?, ?, ?, ?, ?, 'Open', ?)
-            ''', (renter_id, title, description, category, priority, created_date))
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                created_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                cursor.execute('''
+                    INSERT INTO complaints (renter_id, title, description, category, priority, status, created_date)
+                    VALUES (?, ?, ?, ?, ?, 'Open', ?)
+                ''', (renter_id, title, description, category, priority, created_date))
             return True, "Complaint submitted successfully"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
     def get_all_complaints(self):
         """Get all complaints with renter details"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT c.complaint_id, r.name, c.title, c.category, c.priority, c.status, 
-                   c.created_date, c.description, c.admin_response, c.resolved_date, r.phone
-            FROM complaints c
-            JOIN renters r ON c.renter_id = r.renter_id
-            ORDER BY 
-                CASE c.status 
-                    WHEN 'Open' THEN 1 
-                    WHEN 'In Progress' THEN 2 
-                    WHEN 'Resolved' THEN 3 
-                END,
-                CASE c.priority 
-                    WHEN 'High' THEN 1 
-                    WHEN 'Medium' THEN 2 
-                    WHEN 'Low' THEN 3 
-                END,
-                c.created_date DESC
-        ''')
-        complaints = cursor.fetchall()
-        conn.close()
-        return complaints
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT c.complaint_id, r.name, c.title, c.category, c.priority, c.status, 
+                       c.created_date, c.description, c.admin_response, c.resolved_date, r.phone
+                FROM complaints c
+                JOIN renters r ON c.renter_id = r.renter_id
+                ORDER BY 
+                    CASE c.status 
+                        WHEN 'Open' THEN 1 
+                        WHEN 'In Progress' THEN 2 
+                        WHEN 'Resolved' THEN 3 
+                        ELSE 4
+                    END,
+                    CASE c.priority 
+                        WHEN 'High' THEN 1 
+                        WHEN 'Medium' THEN 2 
+                        WHEN 'Low' THEN 3 
+                        ELSE 4
+                    END,
+                    c.created_date DESC
+            ''')
+            return cursor.fetchall()
+    
+    def _complaint_filters(self, status=None, priority=None, category=None, date_from=None, date_to=None):
+        """Build WHERE terms for the complaint filters, plus the triage keys left to order by"""
+        terms = []
+        params = []
+        keys = []
+        
+        # An equality filter on a rank fixes that sort key, so it is dropped from the
+        # ORDER BY; otherwise SQLite falls back to sorting the matches in a temp B-tree
+        if status in COMPLAINT_STATUS_RANK:
+            terms.append(f"{STATUS_RANK_SQL} = ?")
+            params.append(COMPLAINT_STATUS_RANK[status])
+        else:
+            keys.append((STATUS_RANK_SQL, False))
+        
+        if priority in COMPLAINT_PRIORITY_RANK:
+            terms.append(f"{PRIORITY_RANK_SQL} = ?")
+            params.append(COMPLAINT_PRIORITY_RANK[priority])
+        else:
+            keys.append((PRIORITY_RANK_SQL, False))
+        
+        keys.append(("c.created_date", True))
+        keys.append(("c.complaint_id", False))
+        
+        if category:
+            terms.append("c.category = ?")
+            params.append(category)
+        if date_from:
+            terms.append("c.created_date >= ?")
+            params.append(str(date_from))
+        if date_to:
+            # created_date has a time part, so compare against the start of the next day
+            terms.append("c.created_date < ?")
+            params.append(str(date.fromisoformat(str(date_to)) + timedelta(days=1)))
+        
+        return terms, params, keys
     
+    @cached_query('complaints', 'renters')
+    def get_complaints_page(self, page_size=20, after=None, status=None, priority=None,
+                            category=None, date_from=None, date_to=None):
+        """Get one page of complaints in triage order, without the long text columns
+        
+        Rows are (complaint_id, renter_name, title, category, priority, status,
+        created_date, resolved_date, phone); fetch description and admin_response
+        with get_complaint_texts. after is the cursor returned for the previous
+        page. Returns (rows, next_cursor), next_cursor is None on the last page.
+        """
+        terms, params, keys = self._complaint_filters(status, priority, category, date_from, date_to)
+        
+        if after:
+            # Cursor holds every triage key; use the ones this filter set orders by
+            values_by_key = dict(zip(
+                [STATUS_RANK_SQL, PRIORITY_RANK_SQL, "c.created_date", "c.complaint_id"], after
+            ))
+            after_sql, after_params = keyset_after(keys, [values_by_key[expr] for expr, _ in keys])
+            terms.append(after_sql)
+            params.extend(after_params)
+        
+        where = f"WHERE {' AND '.join(terms)}" if terms else ""
+        order_by = ", ".join(f"{expr}{' DESC' if descending else ''}" for expr, descending in keys)
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT c.complaint_id, r.name, c.title, c.category, c.priority, c.status,
+                       c.created_date, c.resolved_date, r.phone
+                FROM complaints c
+                JOIN renters r ON c.renter_id = r.renter_id
+                {where}
+                ORDER BY {order_by}
+                LIMIT ?
+            ''', params + [page_size + 1])
+            rows = cursor.fetchall()
+        
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = (
+                COMPLAINT_STATUS_RANK.get(last[5], COMPLAINT_UNKNOWN_RANK),
+                COMPLAINT_PRIORITY_RANK.get(last[4], COMPLAINT_UNKNOWN_RANK),
+                last[6],
+                last[0]
+            )
+            return rows, next_cursor
+        return rows, None
+    
+    @cached_query('complaints')
+    def get_complaints_count(self, status=None, priority=None, category=None, date_from=None, date_to=None):
+        """Count complaints matching the page filters"""
+        terms, params, _ = self._complaint_filters(status, priority, category, date_from, date_to)
+        where = f"WHERE {' AND '.join(terms)}" if terms else ""
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM complaints c {where}", params)
+            return cursor.fetchone()[0]
+    
+    @cached_query('complaints', 'renters')
+    def search_complaints(self, text, limit=50, status=None, priority=None, category=None,
+                          date_from=None, date_to=None):
+        """Find complaints whose title, description or admin response match text, best match first
+        
+        Rows have the same columns as get_complaints_page. Title matches rank
+        above description matches, which rank above admin response matches.
+        """
+        match = fts_match_query(text)
+        if match is None:
+            return []
+        
+        terms, params, _ = self._complaint_filters(status, priority, category, date_from, date_to)
+        where = "".join(f" AND {term}" for term in terms)
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT c.complaint_id, r.name, c.title, c.category, c.priority, c.status,
+                       c.created_date, c.resolved_date, r.phone
+                FROM complaints_fts
+                JOIN complaints c ON c.complaint_id = complaints_fts.rowid
+                JOIN renters r ON c.renter_id = r.renter_id
+                WHERE complaints_fts MATCH ?{where}
+                ORDER BY {COMPLAINT_SEARCH_RANK_SQL}
+                LIMIT ?
+            ''', [match] + params + [limit])
+            return cursor.fetchall()
+    
+    def get_complaint_texts(self, complaint_ids):
+        """Get {complaint_id: (description, admin_response)} for the given complaints"""
+        if not complaint_ids:
+            return {}
+        
+        placeholders = ", ".join("?" for _ in complaint_ids)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT complaint_id, description, admin_response
+                FROM complaints
+                WHERE complaint_id IN ({placeholders})
+            ''', list(complaint_ids))
+            return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    
+    @cached_query('complaints')
     def get_renter_complaints(self, renter_id):
         """Get complaints for a specific renter"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT complaint_id, title, category, priority, status, created_date, 
-                   description, admin_response, resolved_date
-            FROM complaints
-            WHERE renter_id = ?
-            ORDER BY created_date DESC
-        ''', (renter_id,))
-        complaints = cursor.fetchall()
-        conn.close()
-        return complaints
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT complaint_id, title, category, priority, status, created_date, 
+                       description, admin_response, resolved_date
+                FROM complaints
+                WHERE renter_id = ?
+                ORDER BY created_date DESC
+            ''', (renter_id,))
+            return cursor.fetchall()
     
+    @invalidates('complaints')
     def update_complaint_status(self, complaint_id, status, admin_response=None):
         """Update complaint status and add admin response"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                if status == 'Resolved':
+                    resolved_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    cursor.execute('''
+                        UPDATE complaints
+                        SET status = ?, admin_response = ?, resolved_date = ?
+                        WHERE complaint_id = ?
+                    ''', (status, admin_response, resolved_date, complaint_id))
+                else:
+                    cursor.execute('''
+                        UPDATE complaints
+                        SET status = ?, admin_response = ?
+                        WHERE complaint_id = ?
+                    ''', (status, admin_response, complaint_id))
             
-            if status == 'Resolved':
-                resolved_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                cursor.execute('''
-                    UPDATE complaints
-                    SET status = ?, admin_response = ?, resolved_date = ?
-                    WHERE complaint_id = ?
-                ''', (status, admin_response, resolved_date, complaint_id))
-            else:
-                cursor.execute('''
-                    UPDATE complaints
-                    SET status = ?, admin_response = ?
-                    WHERE complaint_id = ?
-                ''', (status, admin_response, complaint_id))
-            
-            conn.commit()
-            conn.close()
             return True, "Complaint updated successfully"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
     def get_complaint_stats(self):
         """Get complaint statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM complaints WHERE status = 'Open'")
-        open_complaints = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM complaints WHERE status = 'In Progress'")
-        in_progress = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM complaints WHERE status = 'Resolved'")
-        resolved = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM complaints")
-        total = cursor.fetchone()[0]
-        
-        conn.close()
+        counters = self.get_stats_counters()
+        prefix = migrations.COMPLAINT_STATUS_PREFIX
         
         return {
-            'open': open_complaints,
-            'in_progress': in_progress,
-            'resolved': resolved,
-            'total': total
+            'open': counters.get(f"{prefix}Open", 0),
+            'in_progress': counters.get(f"{prefix}In Progress", 0),
+            'resolved': counters.get(f"{prefix}Resolved", 0),
+            'total': counters.get('complaints_total', 0)
         }
     
+    @invalidates('renters')
     def update_renter_profile(self, renter_id, name, email):
         """Update renter profile information"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE renters
-                SET name = ?, email = ?
-                WHERE renter_id = ?
-            ''', (name, email, renter_id))
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE renters
+                    SET name = ?, email = ?
+                    WHERE renter_id = ?
+                ''', (name, email, renter_id))
             return True, "Profile updated successfully"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
     # NOTIFICATION METHODS
+    @invalidates('notifications')
     def add_notification(self, notification_type, message, renter_id=None):
         """Add a notification for admin"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            created_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute('''
-                INSERT INTO notifications (notification_type, message, renter_id, created_date, is_read)
-                VALUES (?, ?, ?, ?, 0)
-            ''', (notification_type, message, renter_id, created_date))
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                created_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                cursor.execute('''
+                    INSERT INTO notifications (notification_type, message, renter_id, created_date, is_read)
+                    VALUES (?, ?, ?, ?, 0)
+                ''', (notification_type, message, renter_id, created_date))
             return True
         except Exception as e:
             return False
     
+    @cached_query('notifications', 'renters')
     def get_admin_notifications(self, limit=50):
         """Get admin notifications"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT n.notification_id, n.notification_type, n.message, n.created_date, 
-                   n.is_read, r.name as renter_name
-            FROM notifications n
-            LEFT JOIN renters r ON n.renter_id = r.renter_id
-            ORDER BY n.is_read ASC, n.created_date DESC
-            LIMIT ?
-        ''', (limit,))
-        notifications = cursor.fetchall()
-        conn.close()
-        return notifications
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT n.notification_id, n.notification_type, n.message, n.created_date, 
+                       n.is_read, r.name as renter_name
+                FROM notifications n
+                LEFT JOIN renters r ON n.renter_id = r.renter_id
+                ORDER BY n.is_read ASC, n.created_date DESC
+                LIMIT ?
+            ''', (limit,))
+            return cursor.fetchall()
     
+    @invalidates('notifications')
     def mark_notification_read(self, notification_id):
         """Mark notification as read"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE notifications
-                SET is_read = 1
-                WHERE notification_id = ?
-            ''', (notification_id,))
-            conn.commit()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE notifications
+                    SET is_read = 1
+                    WHERE notification_id = ?
+                ''', (notification_id,))
             return True
         except Exception as e:
             return False
     
     def get_unread_notification_count(self):
         """Get count of unread notifications"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM notifications WHERE is_read = 0")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
\ No newline at end of file
+        return self.get_stats_counters().get('unread_notifications', 0)
+    
+    # EXPORTS
+    def iter_export(self, name, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield the rows of an EXPORTS query in lists of at most chunk_size"""
+        _, sql = EXPORTS[name]
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
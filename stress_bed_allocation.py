@@ -0,0 +1,131 @@
+"""
+Concurrency stress test for bed allocation
+
+Seeds a fresh database with more renters than beds, then lets many
+threads call allocate_bed at the same time with random renters and beds,
+so the same bed and the same renter are fought over again and again.
+Afterwards it checks that no renter holds two beds, that every occupied
+bed has a renter, that the number of successful allocations equals the
+number of occupied beds, and that the occupied_beds counter agrees.
+Exits with status 1 if any check fails.
+
+Run: python stress_bed_allocation.py [--threads 16] [--attempts 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from simple_database import SimplePGDatabase
+
+
+def seed(db, rooms, renters):
+    for i in range(1, rooms + 1):
+        db.add_room(f"{i:03d}", "AC", 4, 6000)
+    for i in range(1, renters + 1):
+        db.add_renter(f"Renter {i}", f"9{i:09d}", None, date(2025, 1, 1))
+
+
+def hammer(db, thread_id, attempts, rooms, renters, results, lock):
+    rng = random.Random(thread_id)
+    local = {'allocated': 0, 'refused': 0, 'errors': []}
+
+    for _ in range(attempts):
+        renter_id = rng.randint(1, renters)
+        room_id = rng.randint(1, rooms)
+        bed_number = rng.randint(1, 4)
+        success, message = db.allocate_bed(renter_id, room_id, bed_number)
+        if success:
+            local['allocated'] += 1
+        elif message in ("Bed is not available", "Renter already has a bed"):
+            local['refused'] += 1
+        else:
+            local['errors'].append(message)
+
+    with lock:
+        results['allocated'] += local['allocated']
+        results['refused'] += local['refused']
+        results['errors'].extend(local['errors'])
+
+
+def verify(db, allocated):
+    """Return a list of problems found in the beds table"""
+    problems = []
+    with db.connection() as conn:
+        double_booked = conn.execute('''
+            SELECT renter_id, COUNT(*) FROM beds
+            WHERE is_occupied = TRUE
+            GROUP BY renter_id HAVING COUNT(*) > 1
+        ''').fetchall()
+        for renter_id, beds in double_booked:
+            problems.append(f"renter {renter_id} holds {beds} beds")
+
+        orphans = conn.execute(
+            "SELECT COUNT(*) FROM beds WHERE is_occupied = TRUE AND renter_id IS NULL"
+        ).fetchone()[0]
+        if orphans:
+            problems.append(f"{orphans} occupied beds have no renter")
+
+        occupied = conn.execute("SELECT COUNT(*) FROM beds WHERE is_occupied = TRUE").fetchone()[0]
+
+    if occupied != allocated:
+        problems.append(f"{allocated} successful allocations but {occupied} occupied beds")
+
+    counter = db.get_stats_counters().get('occupied_beds', 0)
+    if counter != occupied:
+        problems.append(f"occupied_beds counter is {counter}, table has {occupied}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--renters", type=int, default=60)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db = SimplePGDatabase(os.path.join(workdir, "stress_beds.db"))
+    seed(db, args.rooms, args.renters)
+
+    results = {'allocated': 0, 'refused': 0, 'errors': []}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=hammer, args=(db, t, args.attempts, args.rooms, args.renters, results, lock))
+        for t in range(args.threads)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"🛏️  {args.threads} threads x {args.attempts} attempts on {args.rooms * 4} beds, "
+          f"{args.renters} renters in {elapsed:.2f}s")
+    print(f"   Allocated: {results['allocated']}, refused: {results['refused']}, "
+          f"errors: {len(results['errors'])}")
+
+    problems = verify(db, results['allocated'])
+    problems.extend(sorted(set(results['errors'])))
+
+    print("=" * 50)
+    if problems:
+        print("❌ Allocation problems:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+
+    print("✅ No double bookings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())